@@ -3,7 +3,17 @@ from time import sleep
 
 import streamlit as st
 
+from data.auth_cache import AuthCache
+from data.bootstrap import Bootstrap
+from data.connection_pool import ConnectionPool, mysql_factory
 from data.creyentes_crud import CreyentesCRUD
+from data.logging_setup import configure_logging
+from data.lookup_cache import LookupCache
+from data.permissions import PermissionCache
+from data.scoped_cache import ScopedCache
+from data.search_index import NgramIndex
+from data.snapshot import CreyentesSnapshot
+from data.summary_stats import FunnelStats, SummaryStats
 
 sys.path.append(r"../aapn_ur")
 sys.path.append("../authenticator")
@@ -11,6 +21,9 @@ sys.path.append("../authenticator")
 from auth import AuthManager  # noqa: E402
 from role_manager_db import RoleManagerDB  # noqa: E402
 
+# Logging en segundo plano; solo la primera ejecución del proceso lo configura
+configure_logging()
+
 # Configuración de página con fondo personalizado
 st.set_page_config(
     page_title="Nuevo creyente",
@@ -37,6 +50,121 @@ def set_stage(i):
     st.session_state.stage = i
 
 
+@st.cache_resource(show_spinner=False)
+def get_pool_creyentes():
+    # Pool único por proceso, compartido por todas las sesiones.
+    return ConnectionPool(
+        mysql_factory(
+            host=st.secrets.auth.DB_HOST,
+            database=st.secrets.auth.DB_NAME,
+            user=st.secrets.auth.DB_USER_ADMIN,
+            password=st.secrets.auth.DB_PASSWORD,
+            port=st.secrets.auth.DB_PORT,
+        ),
+        max_size=10,
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_creyentes_crud():
+    # CRUD sin estado por sesión: una instancia por proceso
+    return CreyentesCRUD(get_pool_creyentes())
+
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot_creyentes():
+    crud = get_creyentes_crud()
+    snapshot = CreyentesSnapshot(crud)
+    # Los cambios hechos por fuera de la aplicación también llegan a las cachés del CRUD
+    snapshot.add_listener(crud.entities.on_change)
+    snapshot.add_listener(crud.cedulas.on_change)
+    return snapshot
+
+
+@st.cache_resource(show_spinner=False)
+def get_search_index():
+    # Se construye al primer uso desde el snapshot y se mantiene con las escrituras
+    snapshot = get_snapshot_creyentes()
+    indice = NgramIndex(
+        CreyentesCRUD.TEXT_SEARCH_COLUMNS, loader=lambda: snapshot.read().rows
+    )
+    indice.attach(get_creyentes_crud())
+    indice.attach(snapshot)
+    return indice
+
+
+@st.cache_resource(show_spinner=False)
+def get_summary_stats():
+    # Agregados del tablero: sobre el snapshot, luego deltas por versión
+    return SummaryStats(get_creyentes_crud(), get_snapshot_creyentes())
+
+
+@st.cache_resource(show_spinner=False)
+def get_funnel_stats():
+    return FunnelStats(get_creyentes_crud(), get_snapshot_creyentes())
+
+
+@st.cache_resource(show_spinner=False)
+def get_lookup_cache():
+    return LookupCache(get_creyentes_crud())
+
+
+@st.cache_resource(show_spinner=False)
+def get_scoped_cache():
+    # Caché por usuario y por conjunto de datos; se invalida por ámbito
+    cache = ScopedCache()
+    get_creyentes_crud().add_listener(cache.on_change)
+    get_snapshot_creyentes().add_listener(cache.on_change)
+    return cache
+
+
+@st.cache_resource(show_spinner=False)
+def get_permission_cache():
+    # Permisos compilados por usuario, compartidos entre sesiones
+    return PermissionCache()
+
+
+@st.cache_resource(show_spinner=False)
+def get_auth_cache():
+    # Existencia de usuarios, verificación de contraseñas y tokens de sesión
+    return AuthCache()
+
+
+@st.cache_resource(show_spinner=False)
+def get_bootstrap():
+    # Cargas pesadas del proceso; se lanzan en paralelo tras iniciar sesión
+    # Los recursos se resuelven aquí: los hilos del pool solo reciben objetos
+    crud = get_creyentes_crud()
+    snapshot = get_snapshot_creyentes()
+    indice = get_search_index()
+    lookups = get_lookup_cache()
+    resumen = get_summary_stats()
+    embudo = get_funnel_stats()
+
+    bootstrap = Bootstrap()
+    bootstrap.register("snapshot", lambda: snapshot.read().version)
+    bootstrap.register("indice", indice.ensure_built)
+    bootstrap.register("cedulas", lambda: len(crud.cedulas))
+    bootstrap.register("lookups", lookups.get)
+    bootstrap.register("resumen", resumen.get)
+    bootstrap.register("embudo", embudo.get)
+    return bootstrap
+
+
+def iniciar_carga_datos():
+    # Referencias a los recursos compartidos; construirlos no consulta la base
+    st.session_state.creyentes_crud = get_creyentes_crud()
+    st.session_state.snapshot_creyentes = get_snapshot_creyentes()
+    st.session_state.indice_busqueda = get_search_index()
+    st.session_state.resumen_creyentes = get_summary_stats()
+    st.session_state.embudo_creyentes = get_funnel_stats()
+    st.session_state.lookup_cache = get_lookup_cache()
+    st.session_state.cache_app = get_scoped_cache()
+    # Las cargas corren en segundo plano; las páginas las esperan con wait()
+    st.session_state.bootstrap = get_bootstrap()
+    st.session_state.bootstrap.start()
+
+
 if st.session_state.stage == 0:
     st.session_state.password = ""
 
@@ -61,28 +189,36 @@ if st.session_state.stage == 0:
     # Almacenar el gestor de autenticación en session_state
     st.session_state.auth_manager = AuthManager(st.session_state.conexion)
     st.session_state.role_manager = RoleManagerDB(st.session_state.conexion)
-    st.session_state.creyentes_crud = CreyentesCRUD(st.session_state.conexion)
-    st.session_state.lista_creyentes = st.session_state.creyentes_crud.list()
-    st.session_state.lista_redes = st.session_state.creyentes_crud.get_list_redes()
-    st.session_state.lista_profesiones = (
-        st.session_state.creyentes_crud.get_list_profesiones(limit=200)
-    )
+    st.session_state.permisos = get_permission_cache()
+    st.session_state.auth_cache = get_auth_cache()
+    # Los datos de creyentes se preparan después de iniciar sesión
 
     set_stage(1)
 
 
 def existe_user(username):
-    return st.session_state.auth_manager.user_existe(username)
+    # La respuesta se cachea: las reejecuciones no vuelven a consultar la base
+    return st.session_state.auth_cache.user_exists(
+        username, st.session_state.auth_manager.user_existe
+    )
 
 
 def login(user, passw):
-    return st.session_state.auth_manager.autenticar(user, passw)
+    # bcrypt libera el GIL: cada sesión verifica en paralelo en su propio hilo
+    return st.session_state.auth_cache.authenticate(
+        user, passw, st.session_state.auth_manager.autenticar
+    )
 
 
-@st.cache_data(show_spinner=False)
-def iniciar_sesion(user, password):
-    flag, msg = login(user=user, passw=password)
+def verificar_password():
+    # Solo al cambiar la contraseña, no en cada reejecución de la página
+    if st.session_state.password:
+        st.session_state.resultado_login = login(
+            user=st.session_state.usuario, passw=st.session_state.password
+        )
 
+
+def iniciar_sesion(user, flag, msg):
     if not flag:
         st.toast(msg, icon="⚠️")
     else:
@@ -93,6 +229,10 @@ def iniciar_sesion(user, password):
             st.toast(msg, icon="✅")
             st.session_state.logged_in = True
             st.session_state.user = user
+            st.session_state.token_sesion = st.session_state.auth_cache.issue_token(
+                user
+            )
+            iniciar_carga_datos()
             st.switch_page(MENU_INICIO)
         else:
             st.error("No tienes permisos para acceder a esta aplicación.")
@@ -112,8 +252,9 @@ if st.session_state.stage == 1:
         if existe_user(user):
             st.session_state.usuario = user
             st.success("Usuario validado!")
-            st.session_state.rol_user = (
-                st.session_state.role_manager.load_user_by_username(user)
+            # Se lee el rol de la base y se compila una sola vez
+            st.session_state.rol_user = st.session_state.permisos.put(
+                user, st.session_state.role_manager.load_user_by_username(user)
             )
             st.rerun()
         else:
@@ -129,10 +270,13 @@ if st.session_state.stage == 1:
             type="password",
             key="password",
             placeholder="Ingresa tu contraseña y presiona Enter",
+            on_change=verificar_password,
         )
-        if st.session_state.password:
-            iniciar_sesion(st.session_state.usuario, st.session_state.password)
-        else:
+        if "resultado_login" in st.session_state:
+            iniciar_sesion(
+                st.session_state.usuario, *st.session_state.pop("resultado_login")
+            )
+        elif not st.session_state.password:
             if st.button("Atrás", type="primary"):
                 del st.session_state.usuario
                 del st.session_state.password
@@ -0,0 +1,135 @@
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class AuthCache:
+    """
+    Caché del inicio de sesión, compartida por el proceso.
+
+    - Existencia de usuarios: `user_exists` recuerda la respuesta de la base
+      `positive_ttl` segundos si el usuario existe y `negative_ttl` si no,
+      así las reejecuciones de la página no repiten la consulta.
+    - Verificación de contraseñas: `authenticate` llama a la verificación
+      (bcrypt) en el hilo de la sesión, sin pools ni locks compartidos:
+      bcrypt libera el GIL, así que varios inicios de sesión simultáneos
+      corren en paralelo. Un error al verificar se informa como inicio de
+      sesión fallido. Nunca se guardan contraseñas ni resultados por
+      contraseña.
+    - Sesiones verificadas: `issue_token` entrega un token aleatorio que
+      `verify_token` valida sin volver a verificar la contraseña, hasta
+      `session_ttl` segundos o `revoke`.
+    """
+
+    def __init__(
+        self,
+        positive_ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        session_ttl: float = 8 * 3600.0,
+        max_users: int = 1000,
+    ):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.session_ttl = session_ttl
+        self.max_users = max_users
+        self.logger = logging.getLogger(__class__.__name__)
+        self._lock = threading.Lock()
+        # usuario -> (vence, existe)
+        self._users: "OrderedDict[str, Tuple[float, bool]]" = OrderedDict()
+        # token -> (vence, usuario)
+        self._tokens: Dict[str, Tuple[float, str]] = {}
+
+    def user_exists(self, username: str, checker: Callable[[str], Any]) -> bool:
+        key = self._key(username)
+        if not key:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is not None and now < entry[0]:
+                self._users.move_to_end(key)
+                return entry[1]
+
+        exists = bool(checker(username))
+        ttl = self.positive_ttl if exists else self.negative_ttl
+        with self._lock:
+            self._users[key] = (time.monotonic() + ttl, exists)
+            self._users.move_to_end(key)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return exists
+
+    def forget_user(self, username: Optional[str] = None) -> None:
+        """Descarta la existencia cacheada de `username`, o de todos."""
+        with self._lock:
+            if username is None:
+                self._users.clear()
+            else:
+                self._users.pop(self._key(username), None)
+
+    def authenticate(
+        self,
+        username: str,
+        password: str,
+        verifier: Callable[[str, str], Tuple[bool, str]],
+    ) -> Tuple[bool, str]:
+        """
+        Ejecuta `verifier(usuario, contraseña)` y devuelve `(ok, mensaje)`;
+        si falla (p. ej. se cae la conexión) devuelve `(False, mensaje)`.
+        """
+        inicio = time.perf_counter()
+        try:
+            flag, msg = verifier(username, password)
+        except Exception as e:
+            self.logger.error(
+                "Error verificando a %s: %s", self._key(username), type(e).__name__
+            )
+            return False, "No se pudo verificar la contraseña. Inténtalo de nuevo."
+        self.logger.debug(
+            "Verificación de %s: %.2fs",
+            self._key(username),
+            time.perf_counter() - inicio,
+        )
+        return flag, msg
+
+    def issue_token(self, username: str) -> str:
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self._lock:
+            # Se aprovecha para descartar los vencidos
+            for t in [t for t, (vence, _) in self._tokens.items() if vence <= now]:
+                del self._tokens[t]
+            self._tokens[token] = (now + self.session_ttl, self._key(username))
+        return token
+
+    def verify_token(self, token: Optional[str]) -> Optional[str]:
+        """Usuario dueño del token, o None si no existe o venció."""
+        if not token:
+            return None
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                del self._tokens[token]
+                return None
+            return entry[1]
+
+    def revoke(
+        self, token: Optional[str] = None, username: Optional[str] = None
+    ) -> None:
+        """Anula un token o todos los de un usuario."""
+        with self._lock:
+            if token is not None:
+                self._tokens.pop(token, None)
+            if username is not None:
+                key = self._key(username)
+                for t in [t for t, (_, u) in self._tokens.items() if u == key]:
+                    del self._tokens[t]
+
+    @staticmethod
+    def _key(username: Optional[str]) -> str:
+        return str(username or "").strip().lower()
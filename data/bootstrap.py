@@ -0,0 +1,71 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class Bootstrap:
+    """
+    Carga en segundo plano de los datos compartidos por el proceso.
+
+    Las tareas (`register`) no se ejecutan al abrir la aplicación sino al
+    llamar `start()`, después de iniciar sesión, y corren en paralelo en un
+    pool de hilos. Cada tarea se lanza una sola vez por proceso; las
+    páginas que necesitan un resultado lo esperan con `wait(nombre)`. Si una
+    tarea falla, `wait` propaga el error y el siguiente `start()` la relanza.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.logger = logging.getLogger(__class__.__name__)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bootstrap"
+        )
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Callable[[], Any]] = {}
+        self._futures: Dict[str, Future] = {}
+
+    def register(self, name: str, task: Callable[[], Any]) -> None:
+        with self._lock:
+            self._tasks[name] = task
+
+    def start(self) -> None:
+        """Lanza las tareas que no están en curso ni terminadas con éxito."""
+        with self._lock:
+            for name, task in self._tasks.items():
+                future = self._futures.get(name)
+                if future is not None and not (
+                    future.done() and future.exception() is not None
+                ):
+                    continue
+                self._futures[name] = self._executor.submit(self._run, name, task)
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Resultado de la tarea `name`. Si todavía no se lanzó (p. ej. la
+        página se abrió sin pasar por el inicio de sesión), se lanza ahora.
+        """
+        with self._lock:
+            future = self._futures.get(name)
+        if future is None:
+            self.start()
+            with self._lock:
+                future = self._futures[name]
+        return future.result(timeout=timeout)
+
+    def done(self, name: str) -> bool:
+        with self._lock:
+            future = self._futures.get(name)
+        return future is not None and future.done()
+
+    def _run(self, name: str, task: Callable[[], Any]) -> Any:
+        inicio = time.perf_counter()
+        try:
+            return task()
+        except Exception:
+            self.logger.exception("Falló la carga inicial de %s", name)
+            raise
+        finally:
+            self.logger.info(
+                "Carga inicial %s: %.2fs", name, time.perf_counter() - inicio
+            )
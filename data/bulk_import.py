@@ -0,0 +1,406 @@
+"""Importación masiva de creyentes desde CSV o XLSX."""
+
+import io
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from data.creyentes_crud import CreyentesCRUD
+from data.lookup_cache import Lookups
+from data.search_index import normalize_text
+
+# Mismos límites y obligatorios que el formulario de page2
+MAX_LENGTHS = {
+    "Cedula": 8,
+    "Nombre": 25,
+    "Apellido": 25,
+    "TelefonoCelular": 14,
+    "Correo": 40,
+    "Ocupacion": 20,
+}
+REQUIRED = {
+    "Cedula": "Cédula",
+    "Nombre": "Nombre",
+    "Apellido": "Apellido",
+    "TelefonoCelular": "Teléfono",
+}
+UPPER_COLUMNS = ("Cedula", "Nombre", "Apellido", "TelefonoCelular", "Ocupacion")
+ESTADOS_CIVILES = ("S", "C", "D", "V", "U")
+FECHA_NAC_MIN = date(1950, 1, 1)
+
+# Error de clave duplicada de MySQL (1062) y la clave que lo produjo
+_CLAVE_DUPLICADA = re.compile(r"Duplicate entry .* for key '([^']*)'")
+
+# Encabezados aceptados (normalizados: sin acentos, minúsculas, sin espacios)
+COLUMN_ALIASES = {
+    "cedula": "Cedula",
+    "nombre": "Nombre",
+    "nombres": "Nombre",
+    "apellido": "Apellido",
+    "apellidos": "Apellido",
+    "telefono": "TelefonoCelular",
+    "telefonocelular": "TelefonoCelular",
+    "celular": "TelefonoCelular",
+    "correo": "Correo",
+    "email": "Correo",
+    "ocupacion": "Ocupacion",
+    "sexo": "Sexo",
+    "nacionalidad": "Nacionalidad",
+    "estadocivil": "EstadoCivil",
+    "fechanac": "FechaNac",
+    "fechanacimiento": "FechaNac",
+    "fechadenacimiento": "FechaNac",
+    "red": "CodRed",
+    "codred": "CodRed",
+    "profesion": "IdProfesion",
+    "idprofesion": "IdProfesion",
+    "estatus": "Estatus",
+}
+
+
+@dataclass
+class ImportResult:
+    """
+    Resumen de una importación; `errors` trae una entrada por fila y campo
+    (`campo` None si el error es de la fila completa o de la base).
+    """
+
+    total: int = 0
+    inserted: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rejected(self) -> int:
+        return len({e["fila"] for e in self.errors})
+
+    def errors_frame(self):
+        from pandas import DataFrame
+
+        return DataFrame(self.errors, columns=["fila", "campo", "valor", "error"])
+
+
+class CreyentesImporter:
+    """
+    Valida e inserta creyentes leídos de un archivo, por bloques.
+
+    El archivo se lee de a `chunk_size` filas (CSV con pandas, XLSX con
+    openpyxl en modo solo lectura), cada bloque se valida con operaciones
+    de columna sobre el DataFrame con las mismas reglas del formulario de
+    registro, y las filas válidas se insertan con `create_many` en una
+    transacción por bloque. Las cédulas ya registradas o repetidas se
+    rechazan en memoria antes de enviar el bloque.
+    """
+
+    def __init__(
+        self,
+        crud: CreyentesCRUD,
+        lookups: Lookups,
+        user: Any = 0,
+        chunk_size: int = 2000,
+    ):
+        self.crud = crud
+        self.lookups = lookups
+        self.user = user
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__class__.__name__)
+
+        self._redes = {
+            str(r["CodRed"]).strip().upper(): str(r["CodRed"]) for r in lookups.redes
+        }
+        self._redes.update(
+            {
+                normalize_text(r["NombreRed"]).strip(): str(r["CodRed"])
+                for r in lookups.redes
+            }
+        )
+        self._profesiones = {
+            str(p["IdProfesion"]): int(p["IdProfesion"]) for p in lookups.profesiones
+        }
+        self._profesiones.update(
+            {
+                normalize_text(p["DescripcionProfesion"]).strip(): int(p["IdProfesion"])
+                for p in lookups.profesiones
+            }
+        )
+        default = lookups.profesion_default
+        self._profesion_default = int(default.split("|")[0]) if default else None
+
+    def run(
+        self,
+        data: bytes,
+        filename: str,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ) -> ImportResult:
+        """
+        Importa el archivo completo. `progress(filas_procesadas, fraccion)`
+        se llama después de cada bloque.
+        """
+        inicio = time.perf_counter()
+        result = ImportResult()
+        for chunk, fraccion in self.read_chunks(data, filename):
+            offset = result.total
+            result.total += len(chunk)
+            rows, filas, errors = self.validate(chunk, offset)
+            result.errors.extend(errors)
+            if rows:
+                created = self.crud.create_many(rows)
+                result.inserted += sum(1 for i in created["ids"] if i is not None)
+                for i, mensaje in created["errors"].items():
+                    campo = self._campo_error(mensaje)
+                    result.errors.append(
+                        {
+                            "fila": filas[i],
+                            "campo": campo,
+                            "valor": rows[i].get(campo) if campo else None,
+                            "error": mensaje,
+                        }
+                    )
+            if progress is not None:
+                progress(result.total, fraccion)
+        result.errors.sort(key=lambda e: e["fila"])
+        result.seconds = time.perf_counter() - inicio
+        self.logger.info(
+            "Importación de %s: %d filas, %d insertadas, %d rechazadas en %.1fs",
+            filename,
+            result.total,
+            result.inserted,
+            result.rejected,
+            result.seconds,
+        )
+        return result
+
+    @staticmethod
+    def _campo_error(mensaje: str) -> Optional[str]:
+        """
+        Campo al que se atribuye un error de `create_many`: solo las cédulas
+        duplicadas son de un campo; el resto (claves foráneas, longitudes,
+        fallas de la base) se informan para la fila completa, con None.
+        """
+        if mensaje.startswith("Cédula duplicada"):
+            return "Cedula"
+        duplicada = _CLAVE_DUPLICADA.search(mensaje)
+        if duplicada and "cedula" in duplicada.group(1).lower():
+            return "Cedula"
+        return None
+
+    # Lectura por bloques
+
+    def read_chunks(self, data: bytes, filename: str) -> Iterator[Tuple[Any, float]]:
+        """Bloques `(DataFrame de texto, fracción leída)` con columnas ya mapeadas."""
+        if filename.lower().endswith(".xlsx"):
+            chunks = self._read_xlsx(data)
+        else:
+            chunks = self._read_csv(data)
+        for chunk, fraccion in chunks:
+            yield self._rename_columns(chunk), fraccion
+
+    def _read_csv(self, data: bytes) -> Iterator[Tuple[Any, float]]:
+        import pandas as pd
+
+        buffer = io.BytesIO(data)
+        reader = pd.read_csv(
+            buffer,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=self.chunk_size,
+            sep=None,
+            engine="python",
+            encoding="utf-8-sig",
+        )
+        for chunk in reader:
+            yield chunk, min(buffer.tell() / max(len(data), 1), 1.0)
+
+    def _read_xlsx(self, data: bytes) -> Iterator[Tuple[Any, float]]:
+        import pandas as pd
+
+        try:
+            from openpyxl import load_workbook
+        except ImportError as e:
+            raise RuntimeError(
+                "Para importar archivos .xlsx instala openpyxl (pip install openpyxl)"
+            ) from e
+
+        workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            total = max((sheet.max_row or 1) - 1, 1)
+            rows = sheet.iter_rows(values_only=True)
+            header = [str(h or "").strip() for h in next(rows, ())]
+            leidas = 0
+            buffer: List[List[str]] = []
+            for values in rows:
+                fila = [self._cell_text(v) for v in values[: len(header)]]
+                buffer.append(fila + [""] * (len(header) - len(fila)))
+                if len(buffer) == self.chunk_size:
+                    leidas += len(buffer)
+                    fraccion = min(leidas / total, 1.0)
+                    yield pd.DataFrame(buffer, columns=header), fraccion
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header), 1.0
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _cell_text(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            # Cédulas y teléfonos escritos como número en Excel
+            return str(int(value))
+        if hasattr(value, "date") and callable(value.date):
+            return value.date().isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def _rename_columns(chunk):
+        mapping = {}
+        for col in chunk.columns:
+            key = normalize_text(col).replace(" ", "").replace("_", "")
+            if key in COLUMN_ALIASES:
+                mapping[col] = COLUMN_ALIASES[key]
+        return chunk.rename(columns=mapping)[list(dict.fromkeys(mapping.values()))]
+
+    # Validación
+
+    def validate(
+        self, chunk, offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], List[int], List[Dict[str, Any]]]:
+        """
+        Valida un bloque. Devuelve `(filas válidas, número de fila de cada
+        una, errores)`; la fila 2 es la primera después del encabezado.
+        """
+        import pandas as pd
+
+        n = len(chunk)
+        df = pd.DataFrame(index=range(n))
+        columnas = (
+            *MAX_LENGTHS,
+            "Sexo",
+            "Nacionalidad",
+            "EstadoCivil",
+            "FechaNac",
+            "CodRed",
+            "IdProfesion",
+            "Estatus",
+        )
+        for col in columnas:
+            values = chunk[col] if col in chunk.columns else pd.Series([""] * n)
+            df[col] = values.fillna("").astype(str).str.strip().to_numpy()
+        for col in UPPER_COLUMNS:
+            df[col] = df[col].str.upper()
+        df["Correo"] = df["Correo"].str.lower()
+
+        filas = pd.Series(range(offset + 2, offset + 2 + n))
+        errores: List[pd.DataFrame] = []
+
+        def marcar(mask, campo, mensaje):
+            if mask.any():
+                errores.append(
+                    pd.DataFrame(
+                        {
+                            "fila": filas[mask].to_numpy(),
+                            "campo": campo,
+                            "valor": df.loc[mask, campo].to_numpy(),
+                            "error": mensaje,
+                        }
+                    )
+                )
+
+        for col, etiqueta in REQUIRED.items():
+            marcar(df[col] == "", col, f"{etiqueta}: campo obligatorio")
+        for col, limite in MAX_LENGTHS.items():
+            marcar(df[col].str.len() > limite, col, f"Máximo {limite} caracteres")
+
+        sexo = df["Sexo"].str.upper().str[:1]
+        marcar(~sexo.isin(["", "M", "F"]), "Sexo", "Sexo debe ser M o F")
+        df["Sexo"] = sexo.where(sexo != "", "M")
+
+        nacionalidad = df["Nacionalidad"].str.upper().str[:1]
+        marcar(
+            ~nacionalidad.isin(["", "V", "E"]),
+            "Nacionalidad",
+            "Nacionalidad debe ser V o E",
+        )
+        df["Nacionalidad"] = nacionalidad.where(nacionalidad != "", "V")
+
+        # "Soltero(a)", "casado", "S"... -> código de una letra
+        estado = df["EstadoCivil"].map(normalize_text).str.upper().str[:1]
+        marcar(
+            ~estado.isin(("",) + ESTADOS_CIVILES),
+            "EstadoCivil",
+            f"Estado civil debe ser uno de {', '.join(ESTADOS_CIVILES)}",
+        )
+        df["EstadoCivil"] = estado.where(estado != "", "S")
+
+        # Red: código, nombre o "código|nombre"
+        red = df["CodRed"].str.split("|").str[0].str.strip()
+        codred = red.str.upper().map(self._redes)
+        codred = codred.fillna(red.map(lambda v: self._redes.get(normalize_text(v))))
+        marcar(df["CodRed"] == "", "CodRed", "Red es obligatoria")
+        marcar((df["CodRed"] != "") & codred.isna(), "CodRed", "Red desconocida")
+        df["CodRed"] = codred
+
+        profesion = df["IdProfesion"].str.split("|").str[0].str.strip()
+        id_profesion = profesion.map(self._profesiones)
+        id_profesion = id_profesion.fillna(
+            profesion.map(lambda v: self._profesiones.get(normalize_text(v)))
+        )
+        marcar(
+            (profesion != "") & id_profesion.isna(),
+            "IdProfesion",
+            "Profesión desconocida",
+        )
+        df["IdProfesion"] = id_profesion.where(profesion != "", self._profesion_default)
+
+        fecha = pd.to_datetime(df["FechaNac"], format="%Y-%m-%d", errors="coerce")
+        for formato in ("%d/%m/%Y", "%d-%m-%Y"):
+            fecha = fecha.fillna(
+                pd.to_datetime(df["FechaNac"], format=formato, errors="coerce")
+            )
+        marcar(
+            (df["FechaNac"] != "") & fecha.isna(),
+            "FechaNac",
+            "Fecha inválida (use DD/MM/AAAA)",
+        )
+        fuera = fecha.notna() & (
+            (fecha < pd.Timestamp(FECHA_NAC_MIN)) | (fecha > pd.Timestamp(date.today()))
+        )
+        marcar(
+            fuera, "FechaNac", f"Fecha fuera de rango ({FECHA_NAC_MIN:%d/%m/%Y} a hoy)"
+        )
+        df["FechaNac"] = fecha.dt.date.where(fecha.notna(), None)
+
+        estatus = df["Estatus"].str.lower()
+        marcar(
+            ~estatus.isin(["", "1", "0", "activo", "inactivo"]),
+            "Estatus",
+            "Estatus debe ser 1/0 o Activo/Inactivo",
+        )
+        df["Estatus"] = (~estatus.isin(["0", "inactivo"])).astype(int)
+
+        errors = (
+            pd.concat(errores, ignore_index=True).to_dict("records") if errores else []
+        )
+        con_error = {e["fila"] for e in errors}
+        validas = ~filas.isin(con_error)
+
+        df = df[validas.to_numpy()]
+        df = df.astype(object).where(df.notna() & (df != ""), None)
+        df["Consolidacion"] = 0
+        df["Encuentro"] = 0
+        df["Academia"] = 0
+        df["Lanzamiento"] = 0
+        df["co_us_in"] = self.user
+        df["co_us_mo"] = self.user
+        rows = df.to_dict("records")
+        for row in rows:
+            if row["IdProfesion"] is not None:
+                row["IdProfesion"] = int(row["IdProfesion"])
+        return rows, filas[validas].tolist(), errors
@@ -0,0 +1,172 @@
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def normalize_cedula(cedula: Any) -> str:
+    return str(cedula).strip().upper()
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un `bytearray` con doble hashing.
+
+    Usa `hash()` de Python: las posiciones solo valen dentro del proceso,
+    que es donde vive el filtro.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        h1 = hash(key)
+        h2 = hash((key, self.size)) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class CedulaIndex:
+    """
+    Conjunto en memoria de las cédulas registradas para validar duplicados.
+
+    Se carga la primera vez que se consulta con `loader` (todas las cédulas
+    de una vez, leyendo solo el índice de Cedula) y se mantiene con
+    `on_change`, registrado como listener del CRUD y del snapshot. El filtro
+    de Bloom descarta sin más las cédulas nuevas; los positivos se confirman
+    contra el conteo exacto, que también admite quitar cédulas (borrados y
+    cambios de cédula), cosa que el filtro no puede.
+
+    La carga se hace una sola vez aunque varias sesiones consulten a la vez.
+    Los cambios que llegan mientras `loader` está leyendo se encolan y se
+    aplican sobre lo cargado, así no se pierden escrituras hechas durante
+    la carga.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None,
+        error_rate: float = 0.01,
+    ):
+        self.loader = loader
+        self.error_rate = error_rate
+        self.logger = logging.getLogger(__class__.__name__)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._loading = False
+        self._pending: List[Tuple[str, Dict[int, Dict[str, Any]]]] = []
+        self._bloom = BloomFilter(1, error_rate)
+        self._counts: Dict[str, int] = {}
+        self._by_id: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._counts)
+
+    def __contains__(self, cedula: Any) -> bool:
+        return self.contains(cedula)
+
+    def contains(self, cedula: Any) -> bool:
+        """True si la cédula ya está registrada."""
+        if cedula is None or not str(cedula).strip():
+            return False
+        self._ensure_loaded()
+        key = normalize_cedula(cedula)
+        with self._lock:
+            if key not in self._bloom:
+                return False
+            return key in self._counts
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Reemplaza el contenido con filas `{"Id", "Cedula"}`."""
+        counts: Dict[str, int] = {}
+        by_id: Dict[int, str] = {}
+        for row in rows:
+            if row.get("Cedula") in (None, ""):
+                continue
+            key = normalize_cedula(row["Cedula"])
+            by_id[int(row["Id"])] = key
+            counts[key] = counts.get(key, 0) + 1
+        with self._lock:
+            self._counts = counts
+            self._by_id = by_id
+            # Los cambios recibidos durante la carga se aplican encima
+            for event, changes in self._pending:
+                self._apply(event, changes)
+            self._pending = []
+            self._loading = False
+            self._rebuild_bloom()
+            self._loaded = True
+        self.logger.info("Índice de cédulas cargado: %d cédulas", len(counts))
+
+    def on_change(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        with self._lock:
+            if self._loaded:
+                self._apply(event, changes)
+            elif self._loading:
+                self._pending.append((event, changes))
+
+    def _apply(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        for id_value, data in changes.items():
+            id_value = int(id_value)
+            if event == "delete":
+                self._discard(id_value)
+            elif "Cedula" in data:
+                self._discard(id_value)
+                if data["Cedula"] not in (None, ""):
+                    self._add(id_value, normalize_cedula(data["Cedula"]))
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded or self.loader is None:
+            return
+        with self._load_lock:
+            with self._lock:
+                if self._loaded:
+                    return
+                self._loading = True
+            try:
+                self.load(self.loader())
+            except Exception:
+                with self._lock:
+                    self._loading = False
+                    self._pending = []
+                raise
+
+    def _add(self, id_value: int, key: str) -> None:
+        self._by_id[id_value] = key
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self._bloom.add(key)
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild_bloom()
+
+    def _discard(self, id_value: int) -> None:
+        key = self._by_id.pop(id_value, None)
+        if key is None:
+            return
+        if self._counts.get(key, 0) > 1:
+            self._counts[key] -= 1
+        else:
+            self._counts.pop(key, None)
+
+    def _rebuild_bloom(self) -> None:
+        # Holgura para las altas siguientes sin reconstruir en cada una
+        bloom = BloomFilter(max(len(self._counts) * 2, 1024), self.error_rate)
+        for key in self._counts:
+            bloom.add(key)
+        self._bloom = bloom
@@ -0,0 +1,116 @@
+"""Lectura columnar (Arrow -> pandas) de resultados de `tbl_creyentes`."""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pyarrow as pa
+
+# Tipos Arrow por columna. Las columnas de código corto se guardan como
+# diccionario (categóricas en pandas); las banderas y Estatus como enteros
+# que pandas recibe con nulos (Int8/Int64).
+COLUMN_TYPES: Dict[str, pa.DataType] = {
+    "Id": pa.int64(),
+    "IdProfesion": pa.int64(),
+    "Encuentro": pa.int8(),
+    "Consolidacion": pa.int8(),
+    "Academia": pa.int8(),
+    "Lanzamiento": pa.int8(),
+    "Estatus": pa.int8(),
+    "FechaNac": pa.date32(),
+    "FechaIngreso": pa.date32(),
+    "FechaConvivencia": pa.date32(),
+    "FechaMatrimonio": pa.date32(),
+    "FechaBautizo": pa.date32(),
+    "fe_us_in": pa.timestamp("us"),
+    "fe_us_mo": pa.timestamp("us"),
+}
+CATEGORY_COLUMNS = ("Sexo", "EstadoCivil", "CodRed", "Nacionalidad")
+
+_INT_TYPES = (pa.int8(), pa.int64())
+
+
+def _as_int(value: Any) -> Optional[int]:
+    # Columnas BIT(1) llegan como bytes desde el driver
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        return int.from_bytes(value, "big")
+    return int(value)
+
+
+def _to_array(name: str, values: Sequence[Any]) -> pa.Array:
+    arrow_type = COLUMN_TYPES.get(name)
+    try:
+        if arrow_type in _INT_TYPES:
+            values = [_as_int(v) for v in values]
+        if name in CATEGORY_COLUMNS:
+            arrow_type = pa.string()
+            values = [None if v is None else str(v) for v in values]
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        # Si el esquema real difiere del esperado se deja que Arrow infiera
+        return pa.array(values)
+
+
+def _combine(name: str, arrays: List[pa.Array]) -> pa.Array:
+    if not arrays:
+        return _to_array(name, [])
+    # Un lote con solo nulos se infiere como tipo null: se alinea con el resto
+    target = next((a.type for a in arrays if a.type != pa.null()), pa.null())
+    arrays = [
+        pa.nulls(len(a), target) if a.type == pa.null() else a for a in arrays
+    ]
+    try:
+        return pa.concat_arrays(arrays)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([v for a in arrays for v in a.to_pylist()])
+
+
+def _types_mapper() -> Callable[[pa.DataType], Any]:
+    import pandas as pd
+
+    mapping = {
+        pa.int8(): pd.Int8Dtype(),
+        pa.int64(): pd.Int64Dtype(),
+    }
+    return mapping.get
+
+
+def frame_from_cursor(cursor, batch_size: int = 5000):
+    """
+    Construye un DataFrame tipado leyendo el cursor en lotes de tuplas.
+
+    Cada lote se convierte directamente en arrays columnares, sin pasar por
+    una lista de dicts; las fechas quedan como `datetime.date`,
+    los códigos como categóricas y los enteros como tipos con nulos.
+    """
+    names: List[str] = [d[0] for d in cursor.description or ()]
+    chunks: List[List[pa.Array]] = [[] for _ in names]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for i, values in enumerate(zip(*rows)):
+            chunks[i].append(_to_array(names[i], values))
+
+    table = pa.table(
+        {name: _combine(name, arrays) for name, arrays in zip(names, chunks)}
+    )
+    return table_to_frame(table)
+
+
+def table_from_records(
+    rows: Sequence[Dict[str, Any]], columns: Sequence[str]
+) -> pa.Table:
+    """Tabla Arrow tipada a partir de filas dict (p. ej. el snapshot compartido)."""
+    return pa.table({c: _to_array(c, [r.get(c) for r in rows]) for c in columns})
+
+
+def table_to_frame(table: pa.Table):
+    """DataFrame con categóricas, fechas `datetime.date` y enteros con nulos."""
+    table = table.combine_chunks()
+    for name in CATEGORY_COLUMNS:
+        if name in table.column_names:
+            i = table.column_names.index(name)
+            table = table.set_column(i, name, table.column(i).dictionary_encode())
+
+    return table.to_pandas(types_mapper=_types_mapper(), date_as_object=True)
@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+# pymysql.constants.SERVER_STATUS.SERVER_STATUS_IN_TRANS
+_SERVER_STATUS_IN_TRANS = 1
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión libre dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool acotado y thread-safe de conexiones DB-API.
+
+    `factory` es un callable sin argumentos que devuelve una conexión nueva
+    (ver `mysql_factory`). Las conexiones inactivas se verifican con `ping()`
+    antes de prestarse si llevan más de `health_check_interval` segundos sin
+    uso, y se descartan si superan `max_idle`.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 10,
+        timeout: float = 10.0,
+        max_idle: float = 300.0,
+        health_check_interval: float = 30.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size debe ser mayor o igual a 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self.logger = logging.getLogger(__class__.__name__)
+
+        self._lock = threading.Condition()
+        # (conexión, instante de devolución al pool)
+        self._idle: deque = deque()
+        self._in_use = 0
+        self._closed = False
+
+        # Estadísticas
+        self._created = 0
+        self._discarded = 0
+        self._acquired = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    @property
+    def size(self) -> int:
+        return self._in_use + len(self._idle)
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Presta una conexión sana del pool, creando una si hay cupo."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        waited = False
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("El pool de conexiones está cerrado")
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self.size < self.max_size:
+                    conn, returned_at = None, None
+                    self._in_use += 1
+                    break
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Sin conexiones libres tras {timeout:.1f}s "
+                        f"({self._in_use} en uso)"
+                    )
+                waited = True
+                self._lock.wait(remaining)
+
+            elapsed = time.monotonic() - start
+            self._acquired += 1
+            if waited:
+                self._waits += 1
+                self._wait_time_total += elapsed
+                self._wait_time_max = max(self._wait_time_max, elapsed)
+
+        # La creación y el ping se hacen fuera del lock.
+        try:
+            if conn is not None and not self._is_healthy(conn, returned_at):
+                self._close_quietly(conn)
+                with self._lock:
+                    self._discarded += 1
+                conn = None
+            if conn is None:
+                conn = self.factory()
+                with self._lock:
+                    self._created += 1
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+        return conn
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Devuelve una conexión al pool (o la cierra si `discard`)."""
+        if not discard and self._in_transaction(conn):
+            try:
+                # No dejar transacciones abiertas a la siguiente sesión.
+                conn.rollback()
+            except Exception:
+                discard = True
+        with self._lock:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            self._lock.notify()
+        if conn is not None:
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _in_transaction(conn: Any) -> bool:
+        # PyMySQL actualiza server_status con cada respuesta del servidor: en
+        # autocommit, tras un commit o una lectura no hay nada que deshacer.
+        # Sin ese dato (otro driver) se hace el rollback por las dudas.
+        status = getattr(conn, "server_status", None)
+        if status is None:
+            return True
+        return bool(status & _SERVER_STATUS_IN_TRANS)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager que presta una conexión y la devuelve al salir."""
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except Exception:
+            broken = not self._ping(conn)
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado actual del pool: conexiones en uso, inactivas y tiempos de espera."""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "created": self._created,
+                "discarded": self._discarded,
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "wait_time_total": round(self._wait_time_total, 4),
+                "wait_time_avg": (
+                    round(self._wait_time_total / self._waits, 4) if self._waits else 0.0
+                ),
+                "wait_time_max": round(self._wait_time_max, 4),
+            }
+
+    def close(self) -> None:
+        """Cierra las conexiones inactivas; las prestadas se cierran al devolverse."""
+        with self._lock:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._lock.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def _is_healthy(self, conn: Any, returned_at: float) -> bool:
+        idle_for = time.monotonic() - returned_at
+        if idle_for > self.max_idle:
+            return False
+        if idle_for > self.health_check_interval:
+            return self._ping(conn)
+        return True
+
+    def _ping(self, conn: Any) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception as e:
+            self.logger.warning("Conexión descartada por health check: %s", e)
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def mysql_factory(
+    host: str,
+    database: str,
+    user: str,
+    password: str,
+    port: int = 3306,
+    connect_timeout: int = 10,
+) -> Callable[[], Any]:
+    """Devuelve una factory de conexiones PyMySQL con filas como dict y autocommit."""
+
+    def _connect():
+        import pymysql
+        from pymysql.constants import CLIENT
+        from pymysql.cursors import DictCursor
+
+        return pymysql.connect(
+            host=host,
+            database=database,
+            user=user,
+            password=password,
+            port=int(port),
+            charset="utf8mb4",
+            cursorclass=DictCursor,
+            autocommit=True,
+            # rowcount de UPDATE = filas encontradas, no solo las modificadas
+            client_flag=CLIENT.FOUND_ROWS,
+            connect_timeout=connect_timeout,
+        )
+
+    return _connect
@@ -1,158 +1,783 @@
 import logging
-import logging.config
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from data.cedula_index import CedulaIndex, normalize_cedula
+from data.connection_pool import ConnectionPool
+from data.entity_cache import EntityCache
+from data.logging_setup import Sensitive
+from data.statement_cache import StatementCache
 
 
 class CreyentesCRUD:
     """
     Clase que gestiona operaciones CRUD sobre la tabla `tbl_creyentes`.
 
-    Se espera que `db` sea un objeto con al menos estos métodos:
-      - execute(query: str, params: tuple|dict) -> cursor-like
-      - fetchone(query: str, params: tuple|dict) -> dict|tuple
-      - fetchall(query: str, params: tuple|dict) -> list[dict|tuple]
+    Las conexiones se toman prestadas de un `ConnectionPool` compartido por
+    todas las sesiones y cada operación usa su propio cursor, de modo que
+    no hay estado de conexión compartido entre llamadas concurrentes.
+
+    `get_by_id` y `get_by_cedula` se sirven desde un `EntityCache` que las
+    propias escrituras del CRUD mantienen al día. `cedulas` responde en
+    memoria si una cédula ya está registrada.
 
-    Adapta los nombres de métodos si tu `DatabaseConnector` usa otros.
+    No configura el logging: eso se hace al arrancar la aplicación con
+    `configure_logging`. Los valores de las sentencias se registran como
+    `Sensitive` y con formato diferido.
     """
 
-    logging.config.fileConfig("logging.ini")
+    # Columnas de tbl_creyentes
+    COLUMNS = (
+        "Id",
+        "Cedula",
+        "Nombre",
+        "Apellido",
+        "IdProfesion",
+        "Ocupacion",
+        "Correo",
+        "TelefonoLocal",
+        "TelefonoCelular",
+        "Sexo",
+        "FechaIngreso",
+        "Nacionalidad",
+        "EstadoCivil",
+        "FechaConvivencia",
+        "FechaMatrimonio",
+        "Encuentro",
+        "Consolidacion",
+        "Academia",
+        "Lanzamiento",
+        "FechaNac",
+        "CodRed",
+        "FechaBautizo",
+        "Estatus",
+        "Estado",
+        "Ciudad",
+        "Direccion",
+        "fe_us_in",
+        "co_us_in",
+        "fe_us_mo",
+        "co_us_mo",
+    )
+
+    # Columnas admitidas por `search` para ordenar
+    ORDERABLE_COLUMNS = (
+        "Id",
+        "Cedula",
+        "Nombre",
+        "Apellido",
+        "FechaNac",
+        "CodRed",
+        "fe_us_in",
+        "fe_us_mo",
+    )
+    # Columnas del filtro de texto (`search` e índice de trigramas)
+    TEXT_SEARCH_COLUMNS = ("Cedula", "Nombre", "Apellido", "Correo", "TelefonoCelular")
 
-    def __init__(self, db):
-        self.db = db
-        self.cursor = self.db.get_cursor()
+    # Dimensiones de `count_by`: nombre -> expresión SQL agrupada
+    GROUP_DIMENSIONS = {
+        "CodRed": "CodRed",
+        "Estatus": "Estatus",
+        "Sexo": "Sexo",
+        "EstadoCivil": "EstadoCivil",
+        "Estado": "Estado",
+        "Ciudad": "Ciudad",
+        "MesIngreso": "DATE_FORMAT(FechaIngreso, '%Y-%m')",
+        "MesRegistro": "DATE_FORMAT(fe_us_in, '%Y-%m')",
+    }
+
+    def __init__(self, pool: ConnectionPool, entities: Optional[EntityCache] = None):
+        self.pool = pool
         self.logger = logging.getLogger(__class__.__name__)
+        # Textos INSERT/UPDATE por conjunto de columnas
+        self.statements = StatementCache()
+        self._listeners: List[Callable[[str, Dict[int, Dict[str, Any]]], None]] = []
+        # Filas por Id y por Cédula; se actualiza con cada escritura
+        self.entities = entities if entities is not None else EntityCache()
+        self.add_listener(self.entities.on_change)
+        # Cédulas registradas; se carga al primer uso
+        self.cedulas = CedulaIndex(loader=self.list_cedulas)
+        self.add_listener(self.cedulas.on_change)
+
+    def add_listener(
+        self, callback: Callable[[str, Dict[int, Dict[str, Any]]], None]
+    ) -> None:
+        """
+        Registra un callback que se invoca tras cada escritura confirmada.
+
+        Recibe el evento ("create", "update" o "delete") y `{Id: datos}` con
+        las columnas escritas (vacío en los borrados).
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        if not changes:
+            return
+        for callback in self._listeners:
+            try:
+                callback(event, changes)
+            except Exception as e:
+                self.logger.error("Error notificando %s a %s: %s", event, callback, e)
+
+    @contextmanager
+    def _cursor(self, unbuffered: bool = False, as_tuples: bool = False):
+        """
+        Cursor de lectura sobre una conexión prestada (autocommit).
+
+        Con `unbuffered` las filas se leen del servidor a medida que se
+        iteran en lugar de cargarse completas en memoria; con `as_tuples`
+        se devuelven tuplas en lugar de dicts (lectura columnar).
+        """
+        with self.pool.connection() as conn:
+            if unbuffered or as_tuples:
+                from pymysql import cursors
+
+                cursor_class = {
+                    (True, False): cursors.SSDictCursor,
+                    (True, True): cursors.SSCursor,
+                    (False, True): cursors.Cursor,
+                }[(unbuffered, as_tuples)]
+                cursor = conn.cursor(cursor_class)
+            else:
+                cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Cursor dentro de una transacción: commit al salir, rollback si falla."""
+        with self.pool.connection() as conn:
+            conn.begin()
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+
+    def statement_stats(self) -> Dict[str, Any]:
+        return self.statements.stats()
+
+    def entity_stats(self) -> Dict[str, Any]:
+        return self.entities.stats()
 
     def create(self, data: Dict[str, Any]) -> int:
-        """Inserta un nuevo creyente. Devuelve el Id insertado (si el conector lo soporta)."""
-        cols = []
-        placeholders = []
-        values = []
-        self.db.connection.connect()
-        for k, v in data.items():
-            cols.append(f"`{k}`")
-            placeholders.append("%s")
-            values.append(v)
-
-        query = f"INSERT INTO tbl_creyentes ({', '.join(cols)}) VALUES ({', '.join(placeholders)})"
-        self.db.connection.autocommit(True)
+        """Inserta un nuevo creyente. Devuelve el Id insertado o 0 si falla."""
+        cols = tuple(data.keys())
+        values = [data[k] for k in cols]
+        query = self.statements.get("insert", cols, self._build_insert)
         try:
-            self.logger.info(f"SQL: {query} with values {values}")
-            self.cursor.execute(query, tuple(values))
-            self.db.connection.autocommit(False)
-            return self.cursor.lastrowid()  # si el conector expone esto
+            self.logger.info("SQL: %s with values %s", query, Sensitive(values))
+            with self._transaction() as cursor:
+                cursor.execute(query, tuple(values))
+                new_id = cursor.lastrowid
         except Exception as e:
-            self.logger.error(f"Error creando creyente: {e}")
+            self.logger.error("Error creando creyente: %s", e)
             return 0
-        finally:
-            self.db.connection.close()
+        self._notify("create", {new_id: dict(data, Id=new_id)})
+        return new_id
+
+    @staticmethod
+    def _build_insert(cols: Tuple[str, ...]) -> str:
+        return (
+            f"INSERT INTO tbl_creyentes ({', '.join(f'`{c}`' for c in cols)}) "
+            f"VALUES ({', '.join(['%s'] * len(cols))})"
+        )
+
+    @staticmethod
+    def _build_update(cols: Tuple[str, ...]) -> str:
+        sets = ", ".join(f"`{c}` = %s" for c in cols)
+        return f"UPDATE tbl_creyentes SET {sets} WHERE Id = %s"
+
+    def create_many(
+        self,
+        rows: List[Dict[str, Any]],
+        batch_size: int = 500,
+        reject_duplicates: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Inserta muchos creyentes en una sola transacción.
+
+        Cada fila pasa por `normalize_payload` y se agrupa por conjunto de
+        columnas; cada grupo se envía en INSERTs multi-fila de hasta
+        `batch_size` filas. Si un lote falla se reintenta fila por fila para
+        aislar los errores sin abortar la carga. Las filas que traen un `Id`
+        explícito se insertan de a una y conservan ese Id. Con
+        `reject_duplicates`, las filas cuya cédula ya está registrada (o
+        repetida en la misma carga) se rechazan antes de enviar nada,
+        consultando `cedulas` en memoria.
+
+        Devuelve `{"ids": [...], "errors": {indice: mensaje}}`, donde `ids`
+        está alineado con `rows` y vale None para las filas con error.
+        """
+        ids: List[Optional[int]] = [None] * len(rows)
+        errors: Dict[int, str] = {}
+        if not rows:
+            return {"ids": ids, "errors": errors}
+
+        groups: Dict[tuple, List[tuple]] = {}
+        payloads = []
+        vistas = set()
+        for i, row in enumerate(rows):
+            safe = self.normalize_payload(row)
+            payloads.append(safe)
+            if reject_duplicates and "Cedula" in safe:
+                cedula = normalize_cedula(safe["Cedula"])
+                if cedula in vistas or self.cedulas.contains(cedula):
+                    errors[i] = f"Cédula duplicada: {safe['Cedula']}"
+                    continue
+                vistas.add(cedula)
+            cols = tuple(safe.keys())
+            groups.setdefault(cols, []).append((i, tuple(safe[c] for c in cols)))
+
+        try:
+            with self._transaction() as cursor:
+                for cols, items in groups.items():
+                    col_sql = ", ".join(f"`{c}`" for c in cols)
+                    row_sql = f"({', '.join(['%s'] * len(cols))})"
+                    if "Id" in cols:
+                        # Con Id explícito el servidor no asigna Ids
+                        # consecutivos: se insertan de a una y se usa el Id dado
+                        self._insert_rows_one_by_one(cursor, cols, items, ids, errors)
+                        continue
+                    for start in range(0, len(items), batch_size):
+                        batch = items[start : start + batch_size]
+                        query = (
+                            f"INSERT INTO tbl_creyentes ({col_sql}) "
+                            f"VALUES {', '.join([row_sql] * len(batch))}"
+                        )
+                        self.logger.info(
+                            "SQL: %.200s (%d filas, columnas %s)",
+                            query,
+                            len(batch),
+                            cols,
+                        )
+                        cursor.execute("SAVEPOINT lote")
+                        try:
+                            cursor.execute(
+                                query, tuple(v for _, vals in batch for v in vals)
+                            )
+                            # Un INSERT simple multi-fila recibe Ids consecutivos.
+                            first_id = cursor.lastrowid
+                            for offset, (i, _) in enumerate(batch):
+                                ids[i] = first_id + offset
+                        except Exception as e:
+                            self.logger.warning(
+                                "Lote de %d filas falló (%s); "
+                                "reintentando fila por fila",
+                                len(batch),
+                                e,
+                            )
+                            cursor.execute("ROLLBACK TO SAVEPOINT lote")
+                            self._insert_rows_one_by_one(
+                                cursor, cols, batch, ids, errors
+                            )
+        except Exception as e:
+            self.logger.error("Error en carga masiva de creyentes: %s", e)
+            for i in range(len(rows)):
+                ids[i] = None
+                errors.setdefault(i, str(e))
+        self._notify(
+            "create",
+            {
+                new_id: dict(payloads[i], Id=new_id)
+                for i, new_id in enumerate(ids)
+                if new_id is not None
+            },
+        )
+        return {"ids": ids, "errors": errors}
+
+    def _insert_rows_one_by_one(self, cursor, cols, batch, ids, errors):
+        query = self.statements.get("insert", cols, self._build_insert)
+        id_pos = cols.index("Id") if "Id" in cols else None
+        for i, vals in batch:
+            cursor.execute("SAVEPOINT fila")
+            try:
+                cursor.execute(query, vals)
+                ids[i] = cursor.lastrowid if id_pos is None else int(vals[id_pos])
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT fila")
+                errors[i] = str(e)
 
     def get_by_id(self, id_value: int) -> Optional[Dict[str, Any]]:
+        found, row = self.entities.get_by_id(id_value)
+        if found:
+            return row
         query = "SELECT * FROM tbl_creyentes WHERE Id = %s"
-        self.cursor.execute(query, (id_value,))
-        return self.cursor.fetchone()
+        with self._cursor() as cursor:
+            cursor.execute(query, (id_value,))
+            row = cursor.fetchone()
+        if row is not None:
+            self.entities.put(row)
+        return row
 
     def get_by_cedula(self, cedula: str) -> Optional[Dict[str, Any]]:
+        """Creyente con la cédula dada; las cédulas inexistentes también se recuerdan."""
+        found, row = self.entities.get_by_cedula(cedula)
+        if found:
+            return row
         query = "SELECT * FROM tbl_creyentes WHERE Cedula = %s"
-        self.cursor.execute(query, (cedula,))
-        return self.cursor.fetchone()
+        with self._cursor() as cursor:
+            cursor.execute(query, (cedula,))
+            row = cursor.fetchone()
+        if row is None:
+            self.entities.put_missing(cedula)
+        else:
+            self.entities.put(row)
+        return row
 
     def list(self, limit: int = 100) -> List[Dict[str, Any]]:
-        self.db.connection.connect()
         query = "SELECT * FROM tbl_creyentes ORDER BY Id DESC LIMIT %s"
-        self.cursor.execute(query, (limit,))
-        fetch = self.cursor.fetchall()
-        self.db.connection.close()
-        return fetch
-
-    def get_list_redes(self, limit: int = 100) -> List[Dict[str, Any]]:
-        self.db.connection.connect()
-        query = "SELECT CodRed, NombreRed FROM tbl_redes ORDER BY CodRed ASC LIMIT %s"
-        self.cursor.execute(query, (limit,))
-        fetch = self.cursor.fetchall()
-        return fetch
-
-    def get_list_profesiones(self, limit: int = 100) -> List[Dict[str, Any]]:
-        self.db.connection.connect()
-        query = "SELECT IdProfesion, DescripcionProfesion FROM tbl_profesiones ORDER BY IdProfesion ASC LIMIT %s"
-        self.cursor.execute(query, (limit,))
-        fetch = self.cursor.fetchall()
-        return fetch
+        with self._cursor() as cursor:
+            cursor.execute(query, (limit,))
+            return cursor.fetchall()
+
+    def iter_creyentes(
+        self,
+        after_id: Optional[int] = None,
+        chunk_size: int = 1000,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre `tbl_creyentes` por Id ascendente en memoria constante.
+
+        Cada bloque es una consulta `WHERE Id > ultimo_id ... LIMIT chunk_size`
+        (paginación por clave, sin OFFSET) leída con un cursor sin buffer; la
+        conexión se devuelve al pool entre bloques. Con `columns` solo se
+        leen esas columnas (más Id, que hace de clave).
+        """
+        if columns and "Id" not in columns:
+            columns = ["Id"] + list(columns)
+        query = (
+            f"SELECT {self._select_list(columns)} FROM tbl_creyentes "
+            "WHERE Id > %s ORDER BY Id ASC LIMIT %s"
+        )
+        last_id = -1 if after_id is None else int(after_id)
+        while True:
+            fetched = 0
+            with self._cursor(unbuffered=True) as cursor:
+                cursor.execute(query, (last_id, chunk_size))
+                for row in cursor:
+                    fetched += 1
+                    last_id = row["Id"]
+                    yield row
+            if fetched < chunk_size:
+                return
+
+    def page(
+        self, after_id: Optional[int] = None, size: int = 50, descending: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Página de registros a partir de `after_id` (paginación por clave).
+
+        En orden descendente (más recientes primero) devuelve los Ids menores
+        que `after_id`. `next_after_id` es None cuando no hay más páginas.
+        """
+        if descending:
+            key_sql, order_sql = "Id < %s", "DESC"
+        else:
+            key_sql, order_sql = "Id > %s", "ASC"
+        if after_id is None:
+            query = f"SELECT * FROM tbl_creyentes ORDER BY Id {order_sql} LIMIT %s"
+            params: tuple = (size + 1,)
+        else:
+            query = (
+                f"SELECT * FROM tbl_creyentes WHERE {key_sql} "
+                f"ORDER BY Id {order_sql} LIMIT %s"
+            )
+            params = (int(after_id), size + 1)
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        # Se pide una fila extra solo para saber si hay página siguiente
+        has_more = len(rows) > size
+        rows = rows[:size]
+        return {
+            "rows": rows,
+            "next_after_id": rows[-1]["Id"] if has_more else None,
+        }
+
+    def list_modified_since(self, since: datetime) -> List[Dict[str, Any]]:
+        """Registros con `fe_us_mo` igual o posterior a `since` (usa idx_creyentes_fe_us_mo)."""
+        query = "SELECT * FROM tbl_creyentes WHERE fe_us_mo >= %s ORDER BY Id ASC"
+        with self._cursor() as cursor:
+            cursor.execute(query, (since,))
+            return cursor.fetchall()
+
+    def list_modified_between(
+        self, start: datetime, end: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Registros con `start <= fe_us_mo < end`, más recientes primero.
+
+        Es un rango sobre idx_creyentes_fe_us_mo: el costo depende de las
+        filas del rango, no del tamaño de la tabla.
+        """
+        query = (
+            "SELECT * FROM tbl_creyentes WHERE fe_us_mo >= %s AND fe_us_mo < %s "
+            "ORDER BY fe_us_mo DESC, Id DESC"
+        )
+        with self._cursor() as cursor:
+            cursor.execute(query, (start, end))
+            return cursor.fetchall()
+
+    def list_by_ids(
+        self, ids: List[int], chunk_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Registros completos de los Ids dados, en consultas de `chunk_size`."""
+        rows: List[Dict[str, Any]] = []
+        with self._cursor() as cursor:
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start : start + chunk_size]
+                cursor.execute(
+                    "SELECT * FROM tbl_creyentes WHERE Id IN "
+                    f"({', '.join(['%s'] * len(chunk))}) ORDER BY Id ASC",
+                    tuple(chunk),
+                )
+                rows.extend(cursor.fetchall())
+        return rows
+
+    def list_cedulas(self) -> List[Dict[str, Any]]:
+        """Id y Cedula de todos los registros; se resuelve con idx_creyentes_cedula."""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT Id, Cedula FROM tbl_creyentes WHERE Cedula IS NOT NULL"
+            )
+            return cursor.fetchall()
+
+    def list_ids(self) -> List[int]:
+        """Todos los Ids existentes; se resuelve leyendo solo la clave primaria."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT Id FROM tbl_creyentes")
+            return [row["Id"] for row in cursor.fetchall()]
+
+    def get_list_redes(self, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Redes ordenadas por código; `limit=None` devuelve todas."""
+        query = "SELECT CodRed, NombreRed FROM tbl_redes ORDER BY CodRed ASC"
+        return self._fetch_limited(query, limit)
+
+    def get_list_profesiones(
+        self, limit: Optional[int] = 100
+    ) -> List[Dict[str, Any]]:
+        """Profesiones ordenadas por Id; `limit=None` devuelve todas."""
+        query = "SELECT IdProfesion, DescripcionProfesion FROM tbl_profesiones ORDER BY IdProfesion ASC"
+        return self._fetch_limited(query, limit)
+
+    def _fetch_limited(self, query: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+        params: tuple = ()
+        if limit is not None:
+            query += " LIMIT %s"
+            params = (limit,)
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def count(self) -> int:
+        """Total de registros de la tabla."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS total FROM tbl_creyentes")
+            return int(cursor.fetchone()["total"])
+
+    def count_by(self, dimension: str) -> List[Dict[str, Any]]:
+        """Conteo por valor de una dimensión de `GROUP_DIMENSIONS` (GROUP BY)."""
+        expression = self.GROUP_DIMENSIONS.get(dimension)
+        if expression is None:
+            raise ValueError(f"Dimensión no permitida: {dimension}")
+        query = (
+            f"SELECT {expression} AS valor, COUNT(*) AS total "
+            f"FROM tbl_creyentes GROUP BY {expression}"
+        )
+        with self._cursor() as cursor:
+            # Sin parámetros: los % del DATE_FORMAT no se interpretan
+            cursor.execute(query)
+            return cursor.fetchall()
+
+    def funnel_counts(self) -> List[Dict[str, Any]]:
+        """Por red: total de creyentes y cuántos completaron cada etapa."""
+        query = (
+            "SELECT CodRed, COUNT(*) AS total, "
+            "COALESCE(SUM(Encuentro = 1), 0) AS Encuentro, "
+            "COALESCE(SUM(Consolidacion = 1), 0) AS Consolidacion, "
+            "COALESCE(SUM(Academia = 1), 0) AS Academia, "
+            "COALESCE(SUM(Lanzamiento = 1), 0) AS Lanzamiento, "
+            "COALESCE(SUM(FechaBautizo IS NOT NULL), 0) AS Bautizo "
+            "FROM tbl_creyentes GROUP BY CodRed"
+        )
+        with self._cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchall()
+
+    def get_fecha_nac_range(self) -> Tuple[Any, Any]:
+        """(mínima, máxima) FechaNac registrada; resuelto con el índice de FechaNac."""
+        query = "SELECT MIN(FechaNac) AS desde, MAX(FechaNac) AS hasta FROM tbl_creyentes"
+        with self._cursor() as cursor:
+            cursor.execute(query)
+            row = cursor.fetchone() or {}
+            return row.get("desde"), row.get("hasta")
+
+    def search(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order: Tuple[str, str] = ("Id", "DESC"),
+        page: int = 1,
+        page_size: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Búsqueda paginada con los filtros aplicados en SQL, para quien
+        consulta la base sin pasar por el snapshot compartido.
+
+        Filtros admitidos (todos opcionales):
+          - texto: subcadena en Cedula, Nombre, Apellido, Correo o TelefonoCelular
+          - Sexo, CodRed: valor exacto
+          - Estatus: 1 (activo) o 0 (inactivo)
+          - EstadoCivil: lista de códigos ("S", "C", ...)
+          - FechaNac: tupla (desde, hasta), ambos inclusive
+
+        Devuelve `{"rows", "total", "activos", "page", "page_size", "pages"}`,
+        donde `total` y `activos` cuentan sobre todo el resultado filtrado.
+        """
+        return self._search(filters, order, page, page_size)
+
+    def search_frame(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        order: Tuple[str, str] = ("Id", "DESC"),
+        page: int = 1,
+        page_size: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Igual que `search`, pero la página llega como DataFrame tipado
+        (clave "frame") con solo las `columns` pedidas.
+        """
+        return self._search(filters, order, page, page_size, columns, frame=True)
+
+    def list_frame(self, columns: Optional[List[str]] = None, limit: int = 100):
+        """Últimos `limit` registros como DataFrame tipado con las columnas pedidas."""
+        from data.columnar import frame_from_cursor
+
+        query = (
+            f"SELECT {self._select_list(columns)} FROM tbl_creyentes "
+            "ORDER BY Id DESC LIMIT %s"
+        )
+        with self._cursor(unbuffered=True, as_tuples=True) as cursor:
+            cursor.execute(query, (limit,))
+            return frame_from_cursor(cursor)
+
+    def _search(self, filters, order, page, page_size, columns=None, frame=False):
+        where, params = self._build_where(filters or {})
+        col, direction = order
+        if col not in self.ORDERABLE_COLUMNS:
+            raise ValueError(f"Columna de orden no permitida: {col}")
+        direction = "ASC" if str(direction).upper() == "ASC" else "DESC"
+        page = max(int(page), 1)
+        page_size = max(int(page_size), 1)
+
+        count_query = (
+            "SELECT COUNT(*) AS total, "
+            "COALESCE(SUM(Estatus = 1), 0) AS activos "
+            f"FROM tbl_creyentes {where}"
+        )
+        # Desempate por Id para que la paginación sea estable
+        order_sql = f"`{col}` {direction}" + (f", Id {direction}" if col != "Id" else "")
+        query = (
+            f"SELECT {self._select_list(columns)} FROM tbl_creyentes {where} "
+            f"ORDER BY {order_sql} LIMIT %s OFFSET %s"
+        )
+        page_params = params + (page_size, (page - 1) * page_size)
+        with self._cursor() as cursor:
+            cursor.execute(count_query, params)
+            counts = cursor.fetchone()
+            if not frame:
+                cursor.execute(query, page_params)
+                rows = cursor.fetchall()
+        if frame:
+            from data.columnar import frame_from_cursor
+
+            with self._cursor(unbuffered=True, as_tuples=True) as cursor:
+                cursor.execute(query, page_params)
+                rows = frame_from_cursor(cursor)
+
+        total = int(counts["total"])
+        return {
+            "frame" if frame else "rows": rows,
+            "total": total,
+            "activos": int(counts["activos"]),
+            "page": page,
+            "page_size": page_size,
+            "pages": max((total + page_size - 1) // page_size, 1),
+        }
+
+    @classmethod
+    def _select_list(cls, columns: Optional[List[str]]) -> str:
+        if not columns:
+            return "*"
+        unknown = [c for c in columns if c not in cls.COLUMNS]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas: {', '.join(unknown)}")
+        return ", ".join(f"`{c}`" for c in columns)
+
+    @classmethod
+    def _build_where(cls, filters: Dict[str, Any]) -> Tuple[str, tuple]:
+        """Traduce el diccionario de filtros a una cláusula WHERE parametrizada."""
+        clauses = []
+        params: List[Any] = []
+
+        texto = str(filters.get("texto") or "").strip()
+        if texto:
+            escaped = (
+                texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            clauses.append(
+                "("
+                + " OR ".join(f"`{c}` LIKE %s" for c in cls.TEXT_SEARCH_COLUMNS)
+                + ")"
+            )
+            params.extend([f"%{escaped}%"] * len(cls.TEXT_SEARCH_COLUMNS))
+
+        for col in ("Sexo", "CodRed", "Estatus"):
+            value = filters.get(col)
+            if value is not None and value != "":
+                clauses.append(f"`{col}` = %s")
+                params.append(value)
+
+        estados = filters.get("EstadoCivil")
+        if estados:
+            clauses.append(f"EstadoCivil IN ({', '.join(['%s'] * len(estados))})")
+            params.extend(estados)
+
+        rango = filters.get("FechaNac")
+        if rango:
+            desde, hasta = rango
+            if desde is not None:
+                clauses.append("FechaNac >= %s")
+                params.append(desde)
+            if hasta is not None:
+                clauses.append("FechaNac <= %s")
+                params.append(hasta)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
 
     def update(self, id_value: int, data: Dict[str, Any]) -> int:
         """Actualiza campos para el Id dado. Devuelve número de filas afectadas."""
-        sets = []
-        vals = []
-        self.db.connection.connect()
-        for k, v in data.items():
-            sets.append(f"`{k}` = %s")
-            vals.append(v)
+        cols = tuple(data.keys())
+        vals = [data[k] for k in cols]
         vals.append(id_value)
-        query = f"UPDATE tbl_creyentes SET {', '.join(sets)} WHERE Id = %s"
-        self.db.connection.autocommit(True)
-        self.logger.info(f"SQL: {query} with values {vals}")
-        cursor = self.cursor.execute(query, tuple(vals))
-        self.db.connection.autocommit(False)
+        query = self.statements.get("update", cols, self._build_update)
         try:
-            return cursor
+            self.logger.info("SQL: %s with values %s", query, Sensitive(vals))
+            with self._transaction() as cursor:
+                affected = cursor.execute(query, tuple(vals))
         except Exception as e:
-            self.logger.error(f"Error actualizando creyente: {e}")
+            self.logger.error("Error actualizando creyente: %s", e)
             return 0
-        finally:
-            self.db.connection.close()
+        if affected:
+            self._notify("update", {int(id_value): dict(data)})
+        return affected
 
     def delete(self, id_value: int) -> int:
-        self.db.connection.connect()
         query = "DELETE FROM tbl_creyentes WHERE Id = %s"
-        self.db.connection.autocommit(True)
-        cursor = self.cursor.execute(query, (id_value,))
-        self.db.connection.autocommit(False)
-        self.logger.info(f"SQL: {query} with Id {id_value}")
         try:
-            return cursor
+            self.logger.info("SQL: %s with Id %s", query, id_value)
+            with self._transaction() as cursor:
+                affected = cursor.execute(query, (id_value,))
         except Exception as e:
-            self.logger.error(f"Error eliminando creyente: {e}")
+            self.logger.error("Error eliminando creyente: %s", e)
+            return 0
+        if affected:
+            self._notify("delete", {int(id_value): {}})
+        return affected
+
+    def update_many(self, changes: Dict[int, Dict[str, Any]]) -> int:
+        """Actualiza varios Ids en una transacción. Devuelve filas afectadas."""
+        updated, _ = self.apply_changes(updates=changes)
+        return updated
+
+    def delete_many(self, ids: List[int]) -> int:
+        """Elimina varios Ids con un solo DELETE. Devuelve filas afectadas."""
+        _, deleted = self.apply_changes(deletes=ids)
+        return deleted
+
+    def apply_changes(
+        self,
+        updates: Optional[Dict[int, Dict[str, Any]]] = None,
+        deletes: Optional[List[int]] = None,
+    ) -> Tuple[int, int]:
+        """
+        Aplica actualizaciones y eliminaciones en una sola transacción.
+
+        `updates` es `{Id: {columna: valor}}`. Los Ids con el mismo conjunto de
+        columnas se agrupan en un único UPDATE con `CASE Id WHEN ...`, y los
+        borrados se envían en un `DELETE ... WHERE Id IN (...)`. Devuelve
+        `(actualizados, eliminados)`; `(0, 0)` si la transacción falla.
+        """
+        updates = updates or {}
+        deletes = [int(i) for i in (deletes or [])]
+        if not updates and not deletes:
+            return 0, 0
+        try:
+            with self._transaction() as cursor:
+                updated = self._update_grouped(cursor, updates)
+                deleted = self._delete_in(cursor, deletes)
+        except Exception as e:
+            self.logger.error("Error aplicando cambios en lote: %s", e)
+            return 0, 0
+        if updated:
+            self._notify(
+                "update", {int(i): dict(data) for i, data in updates.items() if data}
+            )
+        if deleted:
+            self._notify("delete", {i: {} for i in deletes})
+        return updated, deleted
+
+    def _update_grouped(self, cursor, updates: Dict[int, Dict[str, Any]]) -> int:
+        groups: Dict[tuple, List[tuple]] = {}
+        for id_value, data in updates.items():
+            cols = tuple(data.keys())
+            if cols:
+                groups.setdefault(cols, []).append((int(id_value), data))
+
+        affected = 0
+        for cols, items in groups.items():
+            sets = []
+            vals: List[Any] = []
+            for c in cols:
+                whens = " ".join(["WHEN %s THEN %s"] * len(items))
+                sets.append(f"`{c}` = CASE Id {whens} ELSE `{c}` END")
+                for id_value, data in items:
+                    vals.extend((id_value, data[c]))
+            ids = [id_value for id_value, _ in items]
+            vals.extend(ids)
+            query = (
+                f"UPDATE tbl_creyentes SET {', '.join(sets)} "
+                f"WHERE Id IN ({', '.join(['%s'] * len(ids))})"
+            )
+            self.logger.info("SQL: UPDATE tbl_creyentes %s for Ids %s", cols, ids)
+            affected += cursor.execute(query, tuple(vals))
+        return affected
+
+    def _delete_in(self, cursor, ids: List[int]) -> int:
+        if not ids:
             return 0
-        finally:
-            self.db.connection.close()
+        query = f"DELETE FROM tbl_creyentes WHERE Id IN ({', '.join(['%s'] * len(ids))})"
+        self.logger.info("SQL: %s with Ids %s", query, ids)
+        return cursor.execute(query, tuple(ids))
 
     # Utility to map form fields to DB columns with basic defaults
     @staticmethod
     def normalize_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
         out = {}
-        mapping = [
-            "Id",
-            "Cedula",
-            "Nombre",
-            "Apellido",
-            "IdProfesion",
-            "Ocupacion",
-            "Correo",
-            "TelefonoLocal",
-            "TelefonoCelular",
-            "Sexo",
-            "FechaIngreso",
-            "Nacionalidad",
-            "EstadoCivil",
-            "FechaConvivencia",
-            "FechaMatrimonio",
-            "Encuentro",
-            "Consolidacion",
-            "Academia",
-            "Lanzamiento",
-            "FechaNac",
-            "CodRed",
-            "FechaBautizo",
-            "Estatus",
-            "Estado",
-            "Ciudad",
-            "Direccion",
-            "fe_us_in",
-            "co_us_in",
-            "fe_us_mo",
-            "co_us_mo",
-        ]
-        for k in mapping:
+        for k in CreyentesCRUD.COLUMNS:
             if k in payload and payload[k] not in (None, ""):
                 out[k] = payload[k]
         # If fe_us_in / fe_us_mo not provided, set current
@@ -0,0 +1,338 @@
+import logging
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from data.search_index import normalize_text
+
+_NO_LETRAS = re.compile(r"[^a-z]")
+_NO_DIGITOS = re.compile(r"\D")
+_VOCALES = set("aeiou")
+
+
+# Los nombres y apellidos se repiten mucho: se memoriza por palabra
+@lru_cache(maxsize=65536)
+def _phonetic_key(word: str) -> str:
+    w = _NO_LETRAS.sub("", normalize_text(word))
+    out: List[str] = []
+    i = 0
+    while i < len(w):
+        c = w[i]
+        nxt = w[i + 1] if i + 1 < len(w) else ""
+        if c == "c" and nxt == "h":
+            code, i = "x", i + 1
+        elif c == "l" and nxt == "l":
+            code, i = "i", i + 1
+        elif c == "q":
+            code = "k"
+            if nxt == "u":
+                i += 1
+        elif c == "g" and nxt == "u" and i + 2 < len(w) and w[i + 2] in "ei":
+            code, i = "g", i + 1
+        elif c == "g" and nxt in ("e", "i"):
+            code = "j"
+        elif c == "c":
+            code = "s" if nxt in ("e", "i") else "k"
+        elif c in "vw":
+            code = "b"
+        elif c in "zx":
+            code = "s"
+        elif c == "y":
+            code = "i"
+        elif c == "h":
+            code = ""
+        else:
+            code = c
+        i += 1
+        if not code:
+            continue
+        if out and code in _VOCALES:
+            continue
+        if out and out[-1] == code:
+            continue
+        out.append(code)
+    return "".join(out)
+
+
+def phonetic_key(word: Any) -> str:
+    """
+    Código fonético de una palabra en español, al estilo Soundex.
+
+    Unifica las letras que suenan igual (b/v/w, s/z/c suave, k/c/q, j/g
+    suave, ll/y/i), quita la h muda, las vocales después de la primera letra
+    y las letras repetidas: "Yoselin" y "Joselyn" no coinciden, pero
+    "Vásquez", "Basques" y "Vazquez" sí.
+    """
+    return _phonetic_key(str(word or ""))
+
+
+def _first_token(value: Any) -> str:
+    parts = str(value or "").split()
+    return parts[0] if parts else ""
+
+
+class DuplicateFinder:
+    """
+    Busca personas registradas dos veces en `tbl_creyentes` sin comparar
+    todos contra todos.
+
+    Las filas se agrupan por claves de bloque (código fonético del primer
+    nombre y primer apellido, FechaNac, últimos dígitos del teléfono) y solo
+    se comparan los pares dentro de cada bloque; los bloques de más de
+    `max_block` filas (fechas o teléfonos de relleno) se descartan. La
+    similitud de nombres es el coseno entre vectores de bigramas de
+    caracteres, calculado con numpy para todos los pares a la vez, y se
+    combina con la coincidencia de FechaNac y teléfono en un puntaje.
+    """
+
+    BLOCKS = ("fonetico", "fecha_nac", "telefono")
+    # Potencia de 2: el hash de bigramas toma los bits altos
+    DIMENSIONS = 128
+    MAX_CHARS = 64
+
+    def __init__(
+        self,
+        max_block: int = 50,
+        min_score: float = 0.75,
+        max_pairs: int = 1000,
+        phone_digits: int = 7,
+    ):
+        self.max_block = max_block
+        self.min_score = min_score
+        self.max_pairs = max_pairs
+        self.phone_digits = phone_digits
+        self.logger = logging.getLogger(__class__.__name__)
+
+    def find(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Pares candidatos ordenados por puntaje descendente, como DataFrame con
+        Id, nombre completo, FechaNac y teléfono de cada lado, la similitud de
+        nombres, el puntaje y los bloques en que coincidieron.
+        """
+        from pandas import DataFrame
+
+        inicio = time.perf_counter()
+        rows = list(rows)
+        ids = np.array([int(r["Id"]) for r in rows], dtype=np.int64)
+        nombres = [
+            " ".join(
+                str(r.get(c) or "").strip() for c in ("Nombre", "Apellido")
+            ).strip()
+            for r in rows
+        ]
+        fechas = [r.get("FechaNac") for r in rows]
+        # FechaNac como número de día (-1 si falta) para comparar pares en bloque
+        dias = np.array(
+            [f.toordinal() if hasattr(f, "toordinal") else -1 for f in fechas],
+            dtype=np.int64,
+        )
+        telefonos = [
+            _NO_DIGITOS.sub("", str(r.get("TelefonoCelular") or "")) for r in rows
+        ]
+
+        keys = {
+            "fonetico": [
+                self._phonetic_block(r.get("Nombre"), r.get("Apellido")) for r in rows
+            ],
+            "fecha_nac": [str(d) if d >= 0 else "" for d in dias.tolist()],
+            "telefono": [
+                t[-self.phone_digits :] if len(t) >= self.phone_digits else ""
+                for t in telefonos
+            ],
+        }
+        a, b, bloques = self._candidate_pairs(keys)
+
+        columnas = [
+            "Id_a",
+            "Id_b",
+            "Nombre_a",
+            "Nombre_b",
+            "FechaNac_a",
+            "FechaNac_b",
+            "Telefono_a",
+            "Telefono_b",
+            "similitud_nombre",
+            "puntaje",
+            "bloques",
+        ]
+        if not len(a):
+            return DataFrame(columns=columnas)
+
+        similitud = self._name_similarity(nombres, a, b)
+        sin_fecha = (dias[a] < 0) | (dias[b] < 0)
+        # Fecha igual suma, desconocida suma la mitad, distinta no suma
+        fecha = np.where(sin_fecha, 0.5, (dias[a] == dias[b]).astype(float))
+        telefono = ((bloques & self._bit("telefono")) > 0).astype(float)
+        puntaje = 0.7 * similitud + 0.15 * fecha + 0.15 * telefono
+
+        keep = np.flatnonzero(puntaje >= self.min_score)
+        keep = keep[np.argsort(-puntaje[keep], kind="stable")][: self.max_pairs]
+        a, b = a[keep], b[keep]
+        frame = DataFrame(
+            {
+                "Id_a": ids[a],
+                "Id_b": ids[b],
+                "Nombre_a": [nombres[i] for i in a],
+                "Nombre_b": [nombres[i] for i in b],
+                "FechaNac_a": [fechas[i] for i in a],
+                "FechaNac_b": [fechas[i] for i in b],
+                "Telefono_a": [rows[i].get("TelefonoCelular") for i in a],
+                "Telefono_b": [rows[i].get("TelefonoCelular") for i in b],
+                "similitud_nombre": np.round(similitud[keep], 3),
+                "puntaje": np.round(puntaje[keep], 3),
+                "bloques": [self._block_names(m) for m in bloques[keep]],
+            },
+            columns=columnas,
+        )
+        self.logger.info(
+            "Duplicados: %d filas, %d pares comparados, %d candidatos en %.2fs",
+            len(rows),
+            len(similitud),
+            len(frame),
+            time.perf_counter() - inicio,
+        )
+        return frame
+
+    @staticmethod
+    def _phonetic_block(nombre: Any, apellido: Any) -> str:
+        n = phonetic_key(_first_token(nombre))
+        a = phonetic_key(_first_token(apellido))
+        return f"{n}|{a}" if n and a else ""
+
+    @classmethod
+    def _bit(cls, block: str) -> int:
+        return 1 << cls.BLOCKS.index(block)
+
+    @classmethod
+    def _block_names(cls, mask: int) -> str:
+        return ", ".join(b for b in cls.BLOCKS if mask & cls._bit(b))
+
+    def _candidate_pairs(
+        self, keys: Dict[str, Sequence[str]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pares (a < b) de posiciones que comparten algún bloque, sin repetir."""
+        codes: List[np.ndarray] = []
+        masks: List[np.ndarray] = []
+        n = 0
+        for block, values in keys.items():
+            n = len(values)
+            a, b = self._block_pairs(values)
+            codes.append(a * n + b)
+            masks.append(np.full(len(a), self._bit(block), dtype=np.int64))
+        if not n:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+
+        code = np.concatenate(codes)
+        mask = np.concatenate(masks)
+        order = np.argsort(code, kind="stable")
+        code, mask = code[order], mask[order]
+        unique, starts = np.unique(code, return_index=True)
+        # Un par que coincide en varios bloques acumula sus bits
+        merged = np.bitwise_or.reduceat(mask, starts) if len(starts) else mask
+        return unique // n, unique % n, merged
+
+    def _block_pairs(self, values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        from pandas import factorize
+
+        codes, _ = factorize(np.asarray(values, dtype=object))
+        valid = np.array([bool(v) for v in values], dtype=bool)
+        positions = np.flatnonzero(valid)
+        codes = codes[valid]
+        order = np.argsort(codes, kind="stable")
+        positions, codes = positions[order], codes[order]
+        _, starts, sizes = np.unique(codes, return_index=True, return_counts=True)
+
+        pares_a: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+        pares_b: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+        # Bloques del mismo tamaño s se procesan juntos como matriz (bloques x s)
+        for size in np.unique(sizes):
+            if size < 2 or size > self.max_block:
+                continue
+            grupo = starts[sizes == size]
+            matriz = positions[grupo[:, None] + np.arange(size)]
+            i, j = np.triu_indices(size, 1)
+            pares_a.append(matriz[:, i].ravel())
+            pares_b.append(matriz[:, j].ravel())
+        a = np.concatenate(pares_a)
+        b = np.concatenate(pares_b)
+        return np.minimum(a, b), np.maximum(a, b)
+
+    def _name_similarity(
+        self, nombres: Sequence[str], a: np.ndarray, b: np.ndarray
+    ) -> np.ndarray:
+        """
+        Coseno entre bigramas (con hash a `DIMENSIONS`) de cada par de nombres.
+        Los anagramas no se confunden con el mismo nombre:
+
+        >>> f = DuplicateFinder()
+        >>> nombres = ["ROMA LEON", "MORA NOEL", "ANA DIAZ", "DANA AZI"]
+        >>> s = f._name_similarity(nombres, np.array([0, 2]), np.array([1, 3]))
+        >>> bool((s < f.min_score).all())
+        True
+        """
+        usadas = np.unique(np.concatenate([a, b]))
+        vectores = np.zeros((len(usadas), self.DIMENSIONS), dtype=np.uint8)
+        paso_filas = 20_000
+        for inicio in range(0, len(usadas), paso_filas):
+            bloque = usadas[inicio : inicio + paso_filas].tolist()
+            vectores[inicio : inicio + len(bloque)] = self._bigram_vectors(
+                [nombres[pos] for pos in bloque]
+            )
+        normas = np.sqrt((vectores.astype(np.float32) ** 2).sum(axis=1))
+        fila_a = np.searchsorted(usadas, a)
+        fila_b = np.searchsorted(usadas, b)
+
+        similitud = np.empty(len(a), dtype=np.float32)
+        paso = 100_000
+        for inicio in range(0, len(a), paso):
+            fa = fila_a[inicio : inicio + paso]
+            fb = fila_b[inicio : inicio + paso]
+            producto = np.einsum(
+                "ij,ij->i",
+                vectores[fa].astype(np.float32),
+                vectores[fb].astype(np.float32),
+            )
+            denominador = normas[fa] * normas[fb]
+            similitud[inicio : inicio + paso] = np.where(
+                denominador > 0, producto / np.maximum(denominador, 1e-9), 0.0
+            )
+        return similitud
+
+    def _bigram_vectors(self, textos: Sequence[str]) -> np.ndarray:
+        """Conteo de bigramas de cada texto, como matriz (textos x DIMENSIONS)."""
+        codificados = [
+            f" {normalize_text(t)} ".encode("ascii", "ignore")[: self.MAX_CHARS]
+            for t in textos
+        ]
+        # Matriz de bytes con relleno 0: los bigramas se arman por columnas
+        letras = (
+            np.array(codificados, dtype=f"S{self.MAX_CHARS}")
+            .view(np.uint8)
+            .reshape(len(textos), self.MAX_CHARS)
+            .astype(np.uint64)
+        )
+        izquierda, derecha = letras[:, :-1], letras[:, 1:]
+        validos = derecha != 0
+        # Hash multiplicativo de 64 bits: la columna sale de los bits altos,
+        # que dependen de las dos letras (con `% DIMENSIONS` la izquierda se
+        # anulaba y los vectores quedaban como histogramas de letras)
+        bits = np.uint64(64 - (self.DIMENSIONS.bit_length() - 1))
+        columnas = (
+            ((izquierda << np.uint64(8)) | derecha) * np.uint64(0x9E3779B97F4A7C15)
+        ) >> bits
+        filas = np.broadcast_to(
+            np.arange(len(textos), dtype=np.uint64)[:, None], columnas.shape
+        )
+        conteo = np.bincount(
+            (filas[validos] * np.uint64(self.DIMENSIONS) + columnas[validos]).astype(
+                np.int64
+            ),
+            minlength=len(textos) * self.DIMENSIONS,
+        )
+        return np.minimum(conteo, 255).astype(np.uint8).reshape(
+            len(textos), self.DIMENSIONS
+        )
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from data.cedula_index import normalize_cedula
+
+# Marca de "no existe" para búsquedas por cédula sin resultado
+_NO_EXISTE = object()
+
+
+class EntityCache:
+    """
+    Caché LRU con TTL de filas de `tbl_creyentes` por Id y por Cédula.
+
+    Las entradas por Id guardan la fila completa; las entradas por Cédula
+    guardan el Id correspondiente o la marca de inexistencia, de modo que la
+    validación de cédula duplicada al registrar no consulta la base cuando
+    la cédula es nueva. Ambas comparten el límite `max_size`.
+
+    Se mantiene al día con `on_change`, registrado como listener del CRUD:
+    los cambios se escriben sobre la fila en caché, los borrados la quitan y
+    las altas invalidan las marcas de inexistencia de sus cédulas.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Any], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get_by_id(self, id_value: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(encontrado, fila). `encontrado` es False si hay que ir a la base."""
+        with self._lock:
+            row = self._get(("id", int(id_value)))
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, dict(row)
+
+    def get_by_cedula(self, cedula: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(encontrado, fila o None si se sabe que la cédula no existe)."""
+        with self._lock:
+            id_value = self._get(("cedula", self._cedula_key(cedula)))
+            if id_value is _NO_EXISTE:
+                self.hits += 1
+                return True, None
+            row = self._get(("id", id_value)) if id_value is not None else None
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, dict(row)
+
+    def put(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            self._put_row(dict(row))
+
+    def put_missing(self, cedula: str) -> None:
+        """Recuerda que `cedula` no está registrada (hasta el TTL o un alta)."""
+        with self._lock:
+            self._set(("cedula", self._cedula_key(cedula)), _NO_EXISTE)
+
+    def invalidate(self, id_value: int) -> None:
+        with self._lock:
+            self._drop_id(int(id_value))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def on_change(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        with self._lock:
+            for id_value, data in changes.items():
+                id_value = int(id_value)
+                if event == "delete":
+                    self._drop_id(id_value)
+                    continue
+                if "Cedula" in data:
+                    self._entries.pop(("cedula", self._cedula_key(data["Cedula"])), None)
+                if event == "create":
+                    # La fila insertada no trae los valores por defecto de la base
+                    continue
+                row = self._get(("id", id_value))
+                if row is not None:
+                    old_cedula = row.get("Cedula")
+                    row = dict(row, **data)
+                    if old_cedula != row.get("Cedula"):
+                        self._entries.pop(("cedula", self._cedula_key(old_cedula)), None)
+                    self._put_row(row)
+
+    # Internos (con el lock tomado)
+
+    def _get(self, key: Tuple[str, Any]) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: Tuple[str, Any], value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _put_row(self, row: Dict[str, Any]) -> None:
+        id_value = int(row["Id"])
+        self._set(("id", id_value), row)
+        if row.get("Cedula") not in (None, ""):
+            self._set(("cedula", self._cedula_key(row["Cedula"])), id_value)
+
+    def _drop_id(self, id_value: int) -> None:
+        row = self._entries.pop(("id", id_value), None)
+        if row is not None and row[1].get("Cedula") not in (None, ""):
+            self._entries.pop(("cedula", self._cedula_key(row[1]["Cedula"])), None)
+
+    @staticmethod
+    def _cedula_key(cedula: Any) -> str:
+        return normalize_cedula(cedula)
@@ -0,0 +1,151 @@
+"""Exportación de creyentes filtrados a CSV, Parquet o XLSX."""
+
+import csv
+import io
+import logging
+import time
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from data.columnar import table_from_records
+from data.creyentes_crud import CreyentesCRUD
+
+# formato -> (tipo MIME, extensión)
+EXPORT_FORMATS = {
+    "CSV": ("text/csv", "csv"),
+    "Parquet": ("application/vnd.apache.parquet", "parquet"),
+    "XLSX": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    ),
+}
+
+
+def _plain(value: Any) -> Any:
+    # Columnas BIT(1) llegan como bytes desde el driver
+    if isinstance(value, (bytes, bytearray)):
+        return int.from_bytes(value, "big")
+    return value
+
+
+class CreyentesExporter:
+    """
+    Escribe en un archivo las filas de creyentes que recibe.
+
+    Las filas llegan como iterable (p. ej. `FilterEngine.iter_rows`, el
+    mismo resultado que se ve en pantalla) y se escriben de a `chunk_size`:
+    CSV fila a fila, Parquet como un grupo de filas por bloque y XLSX con el
+    libro en modo de solo escritura de openpyxl. Lo que ocupa cada bloque en
+    el escritor depende de su tamaño, no del total exportado.
+    """
+
+    def __init__(self, chunk_size: int = 5000):
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__class__.__name__)
+
+    def export(
+        self,
+        out: IO[bytes],
+        fmt: str,
+        rows: Iterable[Dict[str, Any]],
+        columns: Optional[List[str]] = None,
+        total: Optional[int] = None,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ) -> int:
+        """
+        Escribe el resultado en `out` (archivo binario) y devuelve las filas
+        escritas. `total`, si se conoce, permite informar la fracción en
+        `progress(filas, fraccion)`.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+        columns = list(columns or CreyentesCRUD.COLUMNS)
+        inicio = time.perf_counter()
+        chunks = self._chunks(rows)
+        writer = {
+            "CSV": self._write_csv,
+            "Parquet": self._write_parquet,
+            "XLSX": self._write_xlsx,
+        }[fmt]
+
+        escritas = 0
+        for n in writer(out, columns, chunks):
+            escritas += n
+            if progress is not None:
+                fraccion = min(escritas / total, 1.0) if total else 0.0
+                progress(escritas, fraccion)
+        self.logger.info(
+            "Exportación %s: %d filas en %.1fs",
+            fmt,
+            escritas,
+            time.perf_counter() - inicio,
+        )
+        return escritas
+
+    def _chunks(
+        self, rows: Iterable[Dict[str, Any]]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def _write_csv(out, columns, chunks) -> Iterator[int]:
+        text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+        try:
+            writer = csv.writer(text)
+            writer.writerow(columns)
+            for chunk in chunks:
+                writer.writerows([_plain(r.get(c)) for c in columns] for r in chunk)
+                yield len(chunk)
+            text.flush()
+        finally:
+            # El archivo es de quien llama: no se cierra con el wrapper
+            text.detach()
+
+    @staticmethod
+    def _write_parquet(out, columns, chunks) -> Iterator[int]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = table_from_records(chunk, columns)
+                if writer is None:
+                    # Columnas vacías en el primer bloque: se fijan como texto
+                    schema = pa.schema(
+                        [
+                            f.with_type(pa.string()) if f.type == pa.null() else f
+                            for f in table.schema
+                        ]
+                    )
+                    writer = pq.ParquetWriter(out, schema)
+                writer.write_table(table.cast(writer.schema))
+                yield len(chunk)
+            if writer is None:
+                pq.write_table(table_from_records([], columns), out)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    @staticmethod
+    def _write_xlsx(out, columns, chunks) -> Iterator[int]:
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise RuntimeError(
+                "Para exportar a .xlsx instala openpyxl (pip install openpyxl)"
+            ) from e
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Creyentes")
+        sheet.append(columns)
+        for chunk in chunks:
+            for row in chunk:
+                sheet.append([_plain(row.get(c)) for c in columns])
+            yield len(chunk)
+        workbook.save(out)
@@ -0,0 +1,276 @@
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data.columnar import table_from_records, table_to_frame
+from data.creyentes_crud import CreyentesCRUD
+from data.search_index import NgramIndex
+from data.snapshot import SnapshotView
+
+_EPOCH = date(1970, 1, 1)
+# Marca de fecha vacía: queda fuera de cualquier rango de FechaNac
+_SIN_FECHA = np.iinfo(np.int32).min
+_SEPARADOR = "\x1f"
+
+
+def _estatus_a_num(value) -> int:
+    if value is None:
+        return -1
+    value_str = str(value).strip().lower()
+    if value_str in {"1", "true", "t", "si", "sí", "activo"}:
+        return 1
+    if value_str in {"0", "false", "f", "no", "inactivo"}:
+        return 0
+    return -1
+
+
+class FilterEngine:
+    """
+    Motor de filtros en memoria sobre una versión del snapshot de creyentes.
+
+    Al construirse normaliza una sola vez: una columna de texto en minúsculas
+    con los campos buscables concatenados, códigos enteros para Sexo, CodRed
+    y EstadoCivil, Estatus como entero y FechaNac como número de día. Cada
+    combinación de filtros se resuelve con máscaras numpy y los resultados
+    recientes se memorizan. Si se pasa `text_index`, el filtro de texto se
+    resuelve con el índice de trigramas (sin distinguir acentos). Filtros:
+    texto, Sexo, CodRed, Estatus, EstadoCivil (lista) y FechaNac (desde,
+    hasta). `search` pagina el resultado e `iter_rows` lo recorre completo,
+    con exactamente las mismas filas.
+
+    Es inmutable salvo las memorias internas; una instancia por versión se
+    comparte entre sesiones.
+    """
+
+    CATEGORY_FILTERS = ("Sexo", "CodRed", "EstadoCivil")
+
+    def __init__(
+        self,
+        view: SnapshotView,
+        columns: Sequence[str],
+        memo_size: int = 64,
+        text_index: Optional[NgramIndex] = None,
+    ):
+        self.version = view.version
+        self.columns = list(columns)
+        self.memo_size = memo_size
+        self.text_index = text_index
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._memo_texto: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        needed = list(
+            dict.fromkeys(
+                self.columns
+                + ["Id", "Estatus", "FechaNac"]
+                + list(self.CATEGORY_FILTERS)
+                + list(CreyentesCRUD.TEXT_SEARCH_COLUMNS)
+            )
+        )
+        table = table_from_records(view.rows, needed)
+        self.frame = table_to_frame(table.select(self.columns))
+        self.size = table.num_rows
+        # Filas del snapshot (no se copian), en el mismo orden que `frame`
+        self._rows = view.rows
+
+        # Ids en orden descendente, para traducir Ids del índice a posiciones
+        self._ids = pc.fill_null(table.column("Id"), -1).to_numpy().astype(np.int64)
+        self._texto = None if text_index is not None else self._build_text(table)
+        self._codes = {c: self._encode(table.column(c)) for c in self.CATEGORY_FILTERS}
+        self._estatus = self._build_estatus(table.column("Estatus"))
+        self._fecha = self._build_fecha(table.column("FechaNac"))
+        self.activos_total = int((self._estatus == 1).sum())
+
+    def __len__(self) -> int:
+        return self.size
+
+    # Construcción (una vez por versión)
+
+    @staticmethod
+    def _build_text(table: pa.Table) -> pa.Array:
+        partes = [
+            pc.fill_null(pc.cast(table.column(c), pa.string()), "")
+            for c in CreyentesCRUD.TEXT_SEARCH_COLUMNS
+        ]
+        unido = pc.binary_join_element_wise(*partes, _SEPARADOR)
+        return pc.utf8_lower(unido).combine_chunks()
+
+    @staticmethod
+    def _encode(column: pa.ChunkedArray) -> Tuple[np.ndarray, Dict[str, int]]:
+        encoded = pc.cast(column, pa.string()).combine_chunks().dictionary_encode()
+        codes = pc.fill_null(encoded.indices, -1).to_numpy(zero_copy_only=False)
+        lookup = {v: i for i, v in enumerate(encoded.dictionary.to_pylist())}
+        return codes.astype(np.int32), lookup
+
+    @staticmethod
+    def _build_estatus(column: pa.ChunkedArray) -> np.ndarray:
+        if pa.types.is_integer(column.type):
+            return (
+                pc.fill_null(column, -1)
+                .to_numpy()
+                .astype(np.int8)
+            )
+        return np.array([_estatus_a_num(v) for v in column.to_pylist()], dtype=np.int8)
+
+    @staticmethod
+    def _build_fecha(column: pa.ChunkedArray) -> np.ndarray:
+        if not pa.types.is_date32(column.type):
+            return np.full(len(column), _SIN_FECHA, dtype=np.int32)
+        dias = pc.cast(column, pa.int32())
+        return pc.fill_null(dias, int(_SIN_FECHA)).to_numpy().astype(np.int32)
+
+    # Consultas
+
+    def fecha_nac_range(self) -> Tuple[Optional[date], Optional[date]]:
+        validas = self._fecha[self._fecha != _SIN_FECHA]
+        if not len(validas):
+            return None, None
+        return (
+            _EPOCH + timedelta(days=int(validas.min())),
+            _EPOCH + timedelta(days=int(validas.max())),
+        )
+
+    def select(self, filters: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Posiciones (orden Id descendente) que cumplen los filtros."""
+        filters = filters or {}
+        key = self._filters_key(filters)
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+
+        mask = np.ones(self.size, dtype=bool)
+        for col in ("Sexo", "CodRed"):
+            value = filters.get(col)
+            if value is not None and value != "":
+                codes, lookup = self._codes[col]
+                mask &= codes == lookup.get(str(value), -2)
+
+        estatus = filters.get("Estatus")
+        if estatus is not None and estatus != "":
+            mask &= self._estatus == int(estatus)
+
+        estados = filters.get("EstadoCivil")
+        if estados:
+            codes, lookup = self._codes["EstadoCivil"]
+            mask &= np.isin(codes, [lookup.get(str(e), -2) for e in estados])
+
+        rango = filters.get("FechaNac")
+        if rango:
+            desde, hasta = rango
+            if desde is not None:
+                mask &= self._fecha >= (desde - _EPOCH).days
+            if hasta is not None:
+                mask &= self._fecha <= (hasta - _EPOCH).days
+            mask &= self._fecha != _SIN_FECHA
+
+        texto = str(filters.get("texto") or "").strip().lower()
+        if texto:
+            texto_mask = np.zeros(self.size, dtype=bool)
+            texto_mask[self._match_text(texto)] = True
+            mask &= texto_mask
+
+        result = np.flatnonzero(mask)
+        with self._lock:
+            self._memo[key] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+    def _match_text(self, texto: str) -> np.ndarray:
+        """Posiciones cuyo texto contiene `texto`."""
+        with self._lock:
+            # Al seguir escribiendo, la búsqueda anterior acota los candidatos
+            base = max(
+                (t for t in self._memo_texto if t in texto),
+                key=len,
+                default=None,
+            )
+            candidatos = self._memo_texto[base] if base is not None else None
+        if base == texto:
+            return candidatos
+
+        if self.text_index is not None:
+            result = self._positions(self.text_index.search_ids(texto))
+        elif candidatos is None:
+            hits = pc.match_substring(self._texto, texto)
+            result = np.flatnonzero(hits.to_numpy(zero_copy_only=False))
+        else:
+            sub = self._texto.take(pa.array(candidatos))
+            hits = pc.match_substring(sub, texto)
+            result = candidatos[hits.to_numpy(zero_copy_only=False)]
+
+        with self._lock:
+            self._memo_texto[texto] = result
+            if len(self._memo_texto) > self.memo_size:
+                self._memo_texto.popitem(last=False)
+        return result
+
+    def _positions(self, ids: Sequence[int]) -> np.ndarray:
+        """Posiciones de `ids` en este snapshot; los que no están se descartan."""
+        if not len(ids) or not self.size:
+            return np.empty(0, dtype=np.int64)
+        buscados = np.asarray(ids, dtype=np.int64)
+        # -Id es ascendente: búsqueda binaria sobre el orden del snapshot
+        pos = np.searchsorted(-self._ids, -buscados)
+        pos = np.clip(pos, 0, self.size - 1)
+        return np.sort(pos[self._ids[pos] == buscados])
+
+    def search(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order: Tuple[str, str] = ("Id", "DESC"),
+        page: int = 1,
+        page_size: int = 50,
+    ) -> Dict[str, Any]:
+        idx = self.select(filters)
+        col, direction = order
+        ascending = str(direction).upper() == "ASC"
+        if col == "Id":
+            # El snapshot ya está ordenado por Id descendente
+            ordered = idx[::-1] if ascending else idx
+        else:
+            ordered = (
+                self.frame.iloc[idx]
+                .sort_values(col, ascending=ascending, kind="stable")
+                .index.to_numpy()
+            )
+
+        page = max(int(page), 1)
+        page_size = max(int(page_size), 1)
+        start = (page - 1) * page_size
+        total = len(idx)
+        return {
+            "frame": self.frame.iloc[ordered[start : start + page_size]].reset_index(
+                drop=True
+            ),
+            "total": total,
+            "activos": int((self._estatus[idx] == 1).sum()),
+            "page": page,
+            "page_size": page_size,
+            "pages": max((total + page_size - 1) // page_size, 1),
+        }
+
+    def iter_rows(
+        self, filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Filas completas del snapshot que cumplen los filtros (Id desc)."""
+        for position in self.select(filters):
+            yield self._rows[position]
+
+    @staticmethod
+    def _filters_key(filters: Dict[str, Any]) -> tuple:
+        items = []
+        for k, v in sorted(filters.items()):
+            if isinstance(v, list):
+                v = tuple(v)
+            if k == "texto":
+                v = str(v or "").strip().lower()
+            items.append((k, v))
+        return tuple(items)
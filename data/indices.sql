@@ -0,0 +1,9 @@
+-- Índices de tbl_creyentes usados por CreyentesCRUD (búsqueda, filtros y refresco incremental).
+-- Ejecutar una sola vez sobre la base de datos de la aplicación.
+
+CREATE INDEX idx_creyentes_sexo ON tbl_creyentes (Sexo, Estatus);
+CREATE INDEX idx_creyentes_codred ON tbl_creyentes (CodRed, Estatus);
+CREATE INDEX idx_creyentes_estado_civil ON tbl_creyentes (EstadoCivil);
+CREATE INDEX idx_creyentes_fecha_nac ON tbl_creyentes (FechaNac);
+CREATE INDEX idx_creyentes_cedula ON tbl_creyentes (Cedula);
+CREATE INDEX idx_creyentes_fe_us_mo ON tbl_creyentes (fe_us_mo);
@@ -0,0 +1,141 @@
+import atexit
+import copy
+import logging
+import logging.config
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, Tuple
+
+_lock = threading.Lock()
+_listeners: List[QueueListener] = []
+
+
+class Sensitive:
+    """
+    Marca un argumento de log con datos personales (valores de SQL, etc.).
+    Con la redacción activa se escribe `***`, o solo la cantidad de valores
+    si es una colección.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    __repr__ = __str__
+
+
+class RedactingFilter(logging.Filter):
+    """
+    Si `enabled`, reemplaza los argumentos `Sensitive`: las colecciones por
+    `<N valores>` y el resto (textos, números, fechas) por `***`.
+    """
+
+    def __init__(self, enabled: bool = False):
+        super().__init__()
+        self.enabled = enabled
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.enabled and isinstance(record.args, tuple):
+            record.args = tuple(self._mask(a) for a in record.args)
+        return True
+
+    @staticmethod
+    def _mask(arg: Any) -> Any:
+        if not isinstance(arg, Sensitive):
+            return arg
+        value = arg.value
+        if isinstance(value, (list, tuple, dict, set, frozenset)):
+            return f"<{len(value)} valores>"
+        return "***"
+
+
+class SamplingFilter(logging.Filter):
+    """Deja pasar una fracción `rate` de los registros por debajo de WARNING."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # A diferencia de QueueHandler, no formatea el mensaje en el hilo que
+    # registra: el formateo y la escritura los hace el hilo del listener.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            # Las trazas no sobreviven al hilo que las generó
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(
+    path: str = "logging.ini",
+    redact_values: bool = False,
+    sample_rate: float = 1.0,
+) -> bool:
+    """
+    Configura el logging del proceso una sola vez: lee `path` y pasa los
+    handlers de cada logger a un `QueueListener` en segundo plano. Los
+    loggers quedan con un único `QueueHandler`, así que registrar un mensaje
+    solo lo encola; los archivos y la consola se escriben en otro hilo.
+
+    `redact_values` (apagado por defecto) oculta los argumentos marcados
+    con `Sensitive` y `sample_rate` < 1 conserva solo esa fracción de los
+    mensajes INFO/DEBUG. Devuelve False si ya estaba configurado.
+    """
+    with _lock:
+        if _listeners:
+            return False
+        logging.config.fileConfig(path, disable_existing_loggers=False)
+
+        loggers = [logging.getLogger()] + [
+            logging.getLogger(name)
+            for name in logging.root.manager.loggerDict
+            if logging.getLogger(name).handlers
+        ]
+        # Un listener por conjunto distinto de handlers
+        queues: Dict[Tuple[int, ...], QueueHandler] = {}
+        for logger in loggers:
+            handlers = list(logger.handlers)
+            if not handlers:
+                continue
+            key = tuple(id(h) for h in handlers)
+            queue_handler = queues.get(key)
+            if queue_handler is None:
+                cola: "queue.SimpleQueue[Optional[logging.LogRecord]]" = (
+                    queue.SimpleQueue()
+                )
+                queue_handler = _DeferredQueueHandler(cola)
+                queue_handler.addFilter(SamplingFilter(sample_rate))
+                queue_handler.addFilter(RedactingFilter(redact_values))
+                listener = QueueListener(
+                    cola, *handlers, respect_handler_level=True
+                )
+                listener.start()
+                _listeners.append(listener)
+                queues[key] = queue_handler
+            for handler in handlers:
+                logger.removeHandler(handler)
+            logger.addHandler(queue_handler)
+
+        atexit.register(stop_logging)
+        return True
+
+
+def stop_logging() -> None:
+    """Vacía las colas y detiene los listeners (se llama al salir)."""
+    with _lock:
+        while _listeners:
+            _listeners.pop().stop()
@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from data.creyentes_crud import CreyentesCRUD
+
+
+@dataclass(frozen=True)
+class Lookups:
+    """Tablas de referencia y sus opciones "Id|Descripcion" ya armadas."""
+
+    redes: Tuple[Dict[str, Any], ...]
+    profesiones: Tuple[Dict[str, Any], ...]
+    opciones_redes: Tuple[str, ...]
+    opciones_profesiones: Tuple[str, ...]
+    profesion_default: Optional[str]
+    redes_map: Dict[str, str] = field(default_factory=dict)
+
+
+class LookupCache:
+    """
+    Caché por proceso de `tbl_redes` y `tbl_profesiones` con TTL.
+
+    Se carga la primera vez que alguien la pide (no al abrir la página de
+    inicio de sesión) y se vuelve a leer al vencer el TTL o tras
+    `invalidate()`, p. ej. después de editar esas tablas.
+    """
+
+    def __init__(self, crud: CreyentesCRUD, ttl: float = 3600.0):
+        self.crud = crud
+        self.ttl = ttl
+        self.logger = logging.getLogger(__class__.__name__)
+        self._lock = threading.Lock()
+        self._lookups: Optional[Lookups] = None
+        self._loaded_at = 0.0
+
+    def get(self) -> Lookups:
+        with self._lock:
+            if self._lookups is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._lookups = self._load()
+                self._loaded_at = time.monotonic()
+            return self._lookups
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._lookups = None
+
+    def _load(self) -> Lookups:
+        redes = tuple(self.crud.get_list_redes(limit=None))
+        profesiones = tuple(self.crud.get_list_profesiones(limit=None))
+        opciones_redes = tuple(
+            f"{d['CodRed']}|{str(d['NombreRed']).strip()}" for d in redes
+        )
+        opciones_profesiones = tuple(
+            f"{d['IdProfesion']}|{str(d['DescripcionProfesion']).strip()}"
+            for d in profesiones
+        )
+        profesion_default = next(
+            (
+                opcion
+                for opcion in opciones_profesiones
+                if opcion.split("|", 1)[1].upper() == "SIN ASIGNAR"
+            ),
+            opciones_profesiones[0] if opciones_profesiones else None,
+        )
+        self.logger.info(
+            "Tablas de referencia cargadas: %d redes, %d profesiones",
+            len(redes),
+            len(profesiones),
+        )
+        return Lookups(
+            redes=redes,
+            profesiones=profesiones,
+            opciones_redes=opciones_redes,
+            opciones_profesiones=opciones_profesiones,
+            profesion_default=profesion_default,
+            redes_map={str(r["CodRed"]): str(r["NombreRed"]).strip() for r in redes},
+        )
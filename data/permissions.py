@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+# Permisos que consulta la aplicación: (módulo, acción)
+PERMISSION_CHECKS: Tuple[Tuple[str, str], ...] = (
+    ("Creyentes", "create"),
+    ("Creyentes", "read"),
+    ("Creyentes", "update"),
+    ("Creyentes", "delete"),
+)
+
+
+@dataclass(frozen=True)
+class Permissions:
+    """
+    Permisos ya resueltos de un usuario. Expone el mismo `has_permission`
+    que el objeto de `RoleManagerDB`, pero responde con una búsqueda en un
+    frozenset, sin consultar la base.
+    """
+
+    granted: FrozenSet[Tuple[str, str]]
+
+    def has_permission(self, module: str, action: str) -> bool:
+        return (module, action) in self.granted
+
+
+class PermissionCache:
+    """
+    Caché por proceso de permisos compilados, por usuario y con TTL.
+
+    El rol se lee al iniciar sesión (`put`), se evalúa contra
+    `PERMISSION_CHECKS` y se guarda como `Permissions`. Los usuarios con el
+    mismo rol comparten la misma instancia. `get` nunca consulta la base:
+    al vencer el TTL o tras `invalidate()` (p. ej. al cerrar sesión o al
+    cambiar los roles) devuelve el valor anterior y relee el rol en un hilo
+    aparte, así las páginas no esperan a la base mientras se dibujan.
+    """
+
+    def __init__(self, ttl: float = 600.0, retry_delay: float = 30.0):
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self.logger = logging.getLogger(__class__.__name__)
+        self._lock = threading.Lock()
+        self._by_user: Dict[str, Tuple[float, Permissions]] = {}
+        self._interned: Dict[FrozenSet[Tuple[str, str]], Permissions] = {}
+        # Usuarios con una relectura en curso
+        self._refreshing: Set[str] = set()
+
+    def get(
+        self,
+        user: str,
+        loader: Optional[Callable[[], Any]] = None,
+        default: Optional[Permissions] = None,
+    ) -> Optional[Permissions]:
+        """
+        Permisos de `user`, sin esperar a la base. Si vencieron o se
+        invalidaron y se da `loader`, se releen en segundo plano con el objeto
+        de rol que devuelve y mientras tanto se responde con el valor
+        anterior, o `default` si no hay ninguno.
+        """
+        key = str(user or "").lower()
+        with self._lock:
+            entry = self._by_user.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                return entry[1]
+            lanzar = loader is not None and key not in self._refreshing
+            if lanzar:
+                self._refreshing.add(key)
+        if lanzar:
+            threading.Thread(
+                target=self._refresh,
+                args=(key, loader),
+                name=f"permisos-{key}",
+                daemon=True,
+            ).start()
+        return entry[1] if entry is not None else default
+
+    def put(self, user: str, role: Any) -> Permissions:
+        """Compila y guarda los permisos de `role` para `user`."""
+        permissions = role if isinstance(role, Permissions) else self.compile(role)
+        with self._lock:
+            permissions = self._interned.setdefault(permissions.granted, permissions)
+            self._by_user[str(user or "").lower()] = (time.monotonic(), permissions)
+        return permissions
+
+    def invalidate(self, user: Optional[str] = None) -> None:
+        """
+        Marca vencidos los permisos de `user`, o de todos si no se indica:
+        el siguiente `get` los relee y hasta entonces sirve los anteriores.
+        """
+        with self._lock:
+            keys = list(self._by_user) if user is None else [str(user).lower()]
+            for key in keys:
+                entry = self._by_user.get(key)
+                if entry is not None:
+                    self._by_user[key] = (float("-inf"), entry[1])
+
+    def _refresh(self, key: str, loader: Callable[[], Any]) -> None:
+        try:
+            self.put(key, loader())
+        except Exception as e:
+            self.logger.error("No se pudieron releer los permisos de %s: %s", key, e)
+            with self._lock:
+                entry = self._by_user.get(key)
+                if entry is not None:
+                    # Se sigue sirviendo el valor anterior; se reintenta luego
+                    vence = time.monotonic() - self.ttl + self.retry_delay
+                    self._by_user[key] = (vence, entry[1])
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    @staticmethod
+    def compile(role: Any) -> Permissions:
+        if role is None:
+            return Permissions(frozenset())
+        return Permissions(
+            frozenset(
+                (module, action)
+                for module, action in PERMISSION_CHECKS
+                if role.has_permission(module, action)
+            )
+        )
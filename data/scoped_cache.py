@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Ámbitos: ("usuario", nombre) o ("datos", conjunto)
+USER = "usuario"
+DATASET = "datos"
+CREYENTES = "creyentes"
+
+Scope = Tuple[str, Hashable]
+EntryKey = Tuple[Scope, str, Hashable]
+
+
+def user_scope(user: Any) -> Scope:
+    return USER, str(user or "").lower()
+
+
+def dataset_scope(name: str = CREYENTES) -> Scope:
+    return DATASET, name
+
+
+class ScopedCache:
+    """
+    Caché por proceso con entradas agrupadas por ámbito y espacio de nombres.
+
+    Cada entrada vive bajo `(ámbito, espacio, clave)`, donde el ámbito es un
+    usuario (`user_scope`) o un conjunto de datos (`dataset_scope`). En lugar
+    de vaciar toda la caché en cada ejecución de la página, se invalida solo
+    lo afectado:
+
+    - al cerrar sesión, el ámbito del usuario (`invalidate_user`);
+    - al escribir en `tbl_creyentes`, el ámbito de datos `creyentes`
+      (`on_change`, registrado como listener del CRUD y del snapshot);
+    - al cambiar los permisos de un usuario, su ámbito (`bind_user`).
+
+    Las entradas vencen además a los `ttl` segundos y, por encima de
+    `max_entries`, se descartan las menos usadas.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 900.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.logger = logging.getLogger(__class__.__name__)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[EntryKey, Tuple[float, Any]]" = OrderedDict()
+        self._roles: Dict[Scope, Hashable] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(
+        self,
+        scope: Scope,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Devuelve el valor guardado o lo calcula con `loader()` y lo guarda.
+        `loader` se ejecuta fuera del lock: dos sesiones pueden calcular el
+        mismo valor a la vez, pero ninguna bloquea a las demás.
+        """
+        entry_key = (scope, namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[entry_key] = (expires, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(
+        self, scope: Optional[Scope] = None, namespace: Optional[str] = None
+    ) -> int:
+        """Quita las entradas del ámbito y/o espacio dados; devuelve cuántas."""
+        with self._lock:
+            keys = [
+                k
+                for k in self._entries
+                if (scope is None or k[0] == scope)
+                and (namespace is None or k[1] == namespace)
+            ]
+            for k in keys:
+                del self._entries[k]
+        if keys:
+            self.logger.debug(
+                "Invalidadas %d entradas (ámbito=%s, espacio=%s)",
+                len(keys),
+                scope,
+                namespace,
+            )
+        return len(keys)
+
+    def invalidate_user(self, user: Any) -> int:
+        scope = user_scope(user)
+        with self._lock:
+            self._roles.pop(scope, None)
+        return self.invalidate(scope)
+
+    def bind_user(self, user: Any, role: Hashable) -> None:
+        """
+        Registra la firma de permisos con que se está usando el ámbito de
+        `user`; si cambió desde la última vez, sus entradas se descartan.
+        """
+        scope = user_scope(user)
+        with self._lock:
+            previous = self._roles.get(scope)
+            self._roles[scope] = role
+        if previous is not None and previous != role:
+            self.logger.info("Permisos de %s cambiaron: caché invalidada", scope[1])
+            self.invalidate(scope)
+
+    def on_change(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        # Cualquier escritura en tbl_creyentes deja viejos los datos derivados
+        if changes:
+            self.invalidate(dataset_scope(CREYENTES))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._roles.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
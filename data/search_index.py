@@ -0,0 +1,294 @@
+import logging
+import threading
+import unicodedata
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+_SEPARADOR = "\x1f"
+N = 3
+
+
+def normalize_text(value: Any) -> str:
+    """Minúsculas y sin acentos: "José" -> "jose", "Peña" -> "pena"."""
+    if value is None:
+        return ""
+    value = str(value)
+    if value.isascii():
+        return value.lower()
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _ngrams(text: str) -> set:
+    return {
+        text[i : i + N]
+        for i in range(len(text) - N + 1)
+        if _SEPARADOR not in text[i : i + N]
+    }
+
+
+class NgramIndex:
+    """
+    Índice de trigramas en memoria sobre las columnas buscables de creyentes.
+
+    Cada documento es la concatenación normalizada (sin acentos, minúsculas)
+    de los campos de un Id. Las listas de Ids por trigrama son arrays de
+    enteros de 32 bits ordenados, que se intersecan con búsqueda binaria.
+    Las altas y cambios solo agregan al final (la lista se reordena en la
+    siguiente consulta si hace falta) y los candidatos se verifican en bloque
+    contra el texto vigente con Arrow, así que las entradas obsoletas no
+    alteran el resultado y se compactan cuando pasan de `compact_ratio`.
+
+    Las consultas de 1-2 caracteres recorren una columna Arrow con todos los
+    textos. Las escrituras no la invalidan: los Ids cambiados desde que se
+    armó se verifican aparte, y la columna se rehace solo cuando pasan de
+    `max_dirty` (o del 1% de los documentos).
+
+    Se construye al primer uso con `loader` y se mantiene al día
+    registrándose como listener (`attach`) del CRUD y del snapshot.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        loader: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None,
+        compact_ratio: float = 0.3,
+        max_dirty: int = 1024,
+    ):
+        self.columns = tuple(columns)
+        self.loader = loader
+        self.compact_ratio = compact_ratio
+        self.max_dirty = max_dirty
+        self.logger = logging.getLogger(__class__.__name__)
+        self._lock = threading.RLock()
+        self._built = False
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def ensure_built(self) -> int:
+        """Construye el índice si aún no existe; devuelve los documentos."""
+        self._ensure_built()
+        return len(self)
+
+    def attach(self, source) -> None:
+        """Escucha las escrituras de un objeto con `add_listener` (CRUD o snapshot)."""
+        source.add_listener(self._on_change)
+
+    def build(self, rows: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._reset()
+            pending: Dict[str, List[int]] = {}
+            # En orden de Id las listas quedan ordenadas desde el inicio
+            for row in sorted(rows, key=lambda r: r["Id"]):
+                id_value = int(row["Id"])
+                fields = tuple(row.get(c) for c in self.columns)
+                for g in self._store(id_value, fields):
+                    posting = pending.get(g)
+                    if posting is None:
+                        posting = pending[g] = []
+                    posting.append(id_value)
+            self._postings = {g: array("i", ids) for g, ids in pending.items()}
+            self._entries = sum(len(ids) for ids in pending.values())
+            self._built = True
+            self.logger.info(
+                "Índice de búsqueda: %d documentos, %d trigramas",
+                len(self._docs),
+                len(self._postings),
+            )
+
+    def add(self, id_value: int, row: Dict[str, Any]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(id_value)
+            self._add(id_value, tuple(row.get(c) for c in self.columns))
+
+    def update(self, id_value: int, changes: Dict[str, Any]) -> None:
+        """Aplica cambios parciales; solo reindexa si tocan columnas buscables."""
+        with self._lock:
+            if not self._built or not any(c in changes for c in self.columns):
+                return
+            current = self._fields.get(id_value)
+            if current is None:
+                merged = tuple(changes.get(c) for c in self.columns)
+            else:
+                merged = tuple(
+                    changes[c] if c in changes else old
+                    for c, old in zip(self.columns, current)
+                )
+            if merged == current:
+                return
+            self._remove(id_value)
+            self._add(id_value, merged)
+
+    def remove(self, id_value: int) -> None:
+        with self._lock:
+            if self._built:
+                self._remove(id_value)
+
+    def search(
+        self, query: str, prefix: bool = False, limit: Optional[int] = None
+    ) -> List[int]:
+        """
+        Ids cuyo texto contiene `query` (o algún campo empieza por ella si
+        `prefix`). La búsqueda no distingue mayúsculas ni acentos.
+        """
+        ids = self.search_ids(query, prefix)
+        return ids[:limit].tolist() if limit is not None else ids.tolist()
+
+    def search_ids(self, query: str, prefix: bool = False) -> np.ndarray:
+        """Como `search`, pero devuelve un array ordenado de Ids."""
+        q = normalize_text(query).strip()
+        if not q:
+            return np.empty(0, dtype=np.int32)
+        self._ensure_built()
+        needle = _SEPARADOR + q if prefix else q
+
+        with self._lock:
+            grams = _ngrams(q)
+            if not grams:
+                # Consultas de 1-2 caracteres: recorrido lineal del texto
+                ids, docs = self._doc_column()
+                hits = pc.match_substring(docs, needle)
+                result = ids[hits.to_numpy(zero_copy_only=False)]
+                if not self._doc_dirty:
+                    return result
+                # Los Ids cambiados desde que se armó la columna se verifican
+                # contra el texto vigente
+                dirty = np.fromiter(self._doc_dirty, dtype=np.int32)
+                result = result[~np.isin(result, dirty)]
+                extra = np.array(
+                    sorted(
+                        i
+                        for i in self._doc_dirty
+                        if i in self._docs and needle in self._docs[i]
+                    ),
+                    dtype=np.int32,
+                )
+                return np.insert(result, np.searchsorted(result, extra), extra)
+
+            lists = []
+            for g in grams:
+                posting = self._sorted_posting(g)
+                if posting is None:
+                    return np.empty(0, dtype=np.int32)
+                lists.append(posting)
+            lists.sort(key=len)
+            result = lists[0]
+            for posting in lists[1:]:
+                pos = np.searchsorted(posting, result)
+                pos[pos == len(posting)] = 0
+                result = result[posting[pos] == result]
+                if not len(result):
+                    return result
+
+            # Un solo trigrama sin entradas obsoletas ya es coincidencia exacta
+            if len(grams) == 1 and not prefix and not self._stale_entries:
+                return result.copy()
+            # Descarta Ids borrados (entradas obsoletas) y verifica el texto
+            # de los candidatos, que ya son pocos
+            docs = self._docs
+            vigentes = [i for i in result.tolist() if i in docs]
+            textos = pa.array([docs[i] for i in vigentes], type=pa.string())
+            hits = pc.match_substring(textos, needle)
+            return np.array(vigentes, dtype=np.int32)[
+                hits.to_numpy(zero_copy_only=False)
+            ]
+
+    def _doc_column(self):
+        """
+        Ids ordenados y sus textos como array Arrow, armados al primer uso;
+        se rehacen solo cuando hay demasiados Ids cambiados (`_doc_dirty`).
+        """
+        limite = max(self.max_dirty, len(self._docs) // 100)
+        if self._doc_cache is None or len(self._doc_dirty) > limite:
+            ids = np.array(sorted(self._docs), dtype=np.int32)
+            docs = pa.array([self._docs[i] for i in ids.tolist()], type=pa.string())
+            self._doc_cache = (ids, docs)
+            self._doc_dirty = set()
+        return self._doc_cache
+
+    def _sorted_posting(self, gram: str) -> Optional[np.ndarray]:
+        posting = self._postings.get(gram)
+        if posting is None:
+            return None
+        if gram in self._unsorted:
+            unique = np.unique(np.frombuffer(posting, dtype=np.int32))
+            posting = array("i")
+            posting.frombytes(unique.tobytes())
+            self._postings[gram] = posting
+            self._unsorted.discard(gram)
+        return np.frombuffer(posting, dtype=np.int32)
+
+    def _ensure_built(self) -> None:
+        if self._built:
+            return
+        # El loader se llama fuera del lock: puede tomar el lock del snapshot,
+        # que a su vez notifica a este índice.
+        rows = list(self.loader()) if self.loader else []
+        with self._lock:
+            if not self._built:
+                self.build(rows)
+
+    def _reset(self) -> None:
+        self._fields: Dict[int, tuple] = {}
+        self._docs: Dict[int, str] = {}
+        self._postings: Dict[str, array] = {}
+        # Trigramas cuya lista dejó de estar ordenada tras una actualización
+        self._unsorted: set = set()
+        self._entries = 0
+        self._stale_entries = 0
+        self._doc_cache = None
+        # Ids cambiados o borrados después de armar `_doc_cache`
+        self._doc_dirty: set = set()
+
+    def _store(self, id_value: int, fields: tuple) -> set:
+        doc = _SEPARADOR + _SEPARADOR.join(normalize_text(v) for v in fields)
+        self._fields[id_value] = fields
+        self._docs[id_value] = doc
+        if self._doc_cache is not None:
+            self._doc_dirty.add(id_value)
+        return _ngrams(doc)
+
+    def _add(self, id_value: int, fields: tuple) -> None:
+        for g in self._store(id_value, fields):
+            posting = self._postings.get(g)
+            if posting is None:
+                posting = self._postings[g] = array("i")
+            elif posting[-1] >= id_value:
+                self._unsorted.add(g)
+            posting.append(id_value)
+            self._entries += 1
+
+    def _remove(self, id_value: int) -> None:
+        doc = self._docs.pop(id_value, None)
+        self._fields.pop(id_value, None)
+        if doc is None:
+            return
+        if self._doc_cache is not None:
+            self._doc_dirty.add(id_value)
+        # Las entradas quedan en las listas y se filtran al verificar
+        self._stale_entries += len(_ngrams(doc))
+        if self._entries and self._stale_entries / self._entries > self.compact_ratio:
+            self._compact()
+
+    def _compact(self) -> None:
+        fields = self._fields
+        self._reset()
+        for id_value in sorted(fields):
+            self._add(id_value, fields[id_value])
+
+    def _on_change(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        for id_value, data in changes.items():
+            if event == "delete":
+                self.remove(id_value)
+            elif event == "create":
+                self.add(id_value, data)
+            else:
+                self.update(id_value, data)
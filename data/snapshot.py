@@ -0,0 +1,328 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from data.creyentes_crud import CreyentesCRUD
+
+
+@dataclass(frozen=True)
+class SnapshotView:
+    """Vista inmutable de una versión del snapshot (filas ordenadas por Id desc)."""
+
+    version: int
+    rows: Tuple[Dict[str, Any], ...]
+    watermark: Optional[datetime]
+    refreshed_at: float
+
+
+class CreyentesSnapshot:
+    """
+    Copia en memoria de `tbl_creyentes` compartida por todas las sesiones.
+
+    La primera lectura carga la tabla completa con `iter_creyentes`; las
+    siguientes solo piden las filas con `fe_us_mo` >= la última marca de agua
+    menos `watermark_lag` segundos y las combinan por Id. `fe_us_mo` lo pone
+    el reloj de la aplicación, no el commit: el margen cubre transacciones
+    que confirman después de que la marca ya pasó su `fe_us_mo`.
+
+    Las altas y cambios hechos a través del CRUD se leen por Id en el
+    siguiente refresco y los borrados se aplican al instante, vía listener.
+    Cada `reconcile_interval` segundos se compara la lista de Ids: se quitan
+    los borrados y se leen los Ids que falten (cambios externos que
+    quedaron fuera del margen).
+
+    Las filas compartidas no deben modificarse: las sesiones reciben
+    `SnapshotView` y construyen sus propios DataFrames a partir de ella.
+
+    Con `add_listener` otros componentes reciben los cambios detectados en
+    cada refresco, con la misma firma que los listeners del CRUD. Con
+    `add_delta_listener` reciben además la fila anterior de cada cambio,
+    `{Id: (anterior, nueva)}` con None en altas o borrados, y la versión
+    que resulta de aplicarlos, para mantener agregados sin volver a recorrer
+    la tabla: una vista de versión `v` ya incluye los cambios hasta `v`.
+    """
+
+    def __init__(
+        self,
+        crud: CreyentesCRUD,
+        min_refresh_interval: float = 5.0,
+        reconcile_interval: float = 300.0,
+        watermark_lag: float = 60.0,
+    ):
+        self.crud = crud
+        self.min_refresh_interval = min_refresh_interval
+        self.reconcile_interval = reconcile_interval
+        self.watermark_lag = watermark_lag
+        self.logger = logging.getLogger(__class__.__name__)
+
+        self._lock = threading.RLock()
+        # Serializa los refrescos; las consultas a la base se hacen sin `_lock`
+        self._refresh_lock = threading.Lock()
+        self._fetching = False
+        # Ids borrados por el CRUD mientras un refresco consulta la base
+        self._deleted_while_fetching: Set[int] = set()
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._watermark: Optional[datetime] = None
+        self._version = 0
+        self._loaded = False
+        self._stale = False
+        # Ids creados o modificados por el CRUD, a leer en el próximo refresh
+        self._pending_ids: Set[int] = set()
+        self._last_refresh = 0.0
+        self._last_reconcile = 0.0
+        self._view: Optional[SnapshotView] = None
+        self._listeners: List[Callable[[str, Dict[int, Dict[str, Any]]], None]] = []
+        self._delta_listeners: List[
+            Callable[[Dict[int, Tuple[Any, Any]], int], None]
+        ] = []
+
+        crud.add_listener(self._on_write)
+
+    def add_listener(
+        self, callback: Callable[[str, Dict[int, Dict[str, Any]]], None]
+    ) -> None:
+        self._listeners.append(callback)
+
+    def add_delta_listener(
+        self, callback: Callable[[Dict[int, Tuple[Any, Any]], int], None]
+    ) -> None:
+        self._delta_listeners.append(callback)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def read(self) -> SnapshotView:
+        """Devuelve la vista actual, refrescando si el snapshot está vencido."""
+        self.refresh()
+        return self._current_view()
+
+    def current(self) -> Optional[SnapshotView]:
+        """Vista actual sin refrescar ni cargar; None si aún no se cargó."""
+        if not self._loaded:
+            return None
+        return self._current_view()
+
+    def _current_view(self) -> SnapshotView:
+        with self._lock:
+            if self._view is None or self._view.version != self._version:
+                rows = tuple(
+                    self._rows[i] for i in sorted(self._rows, reverse=True)
+                )
+                self._view = SnapshotView(
+                    self._version, rows, self._watermark, self._last_refresh
+                )
+            return self._view
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Trae los cambios desde la última marca de agua. Devuelve la versión.
+
+        Si otra sesión refrescó hace menos de `min_refresh_interval`
+        segundos no se consulta la base de datos, salvo `force` o que haya
+        escrituras locales pendientes.
+
+        Las consultas se hacen fuera del lock de las filas, así que mientras
+        una sesión refresca las demás siguen leyendo la vista actual. Corre
+        un solo refresco a la vez: si ya hay uno en curso se devuelve la
+        versión actual sin esperarlo, salvo `force` o la primera carga.
+        """
+        if not self._needs_refresh(force):
+            return self._version
+        if not self._refresh_lock.acquire(blocking=force or not self._loaded):
+            return self._version
+        try:
+            if not self._needs_refresh(force):
+                return self._version
+            events, deltas, version = self._refresh_locked()
+        finally:
+            self._refresh_lock.release()
+
+        # Se notifica fuera del lock para no bloquear a los lectores
+        for event, changes in events:
+            self._notify(event, changes)
+        self._notify_deltas(deltas, version)
+        return version
+
+    def _needs_refresh(self, force: bool) -> bool:
+        with self._lock:
+            return (
+                not self._loaded
+                or force
+                or self._stale
+                or time.monotonic() - self._last_refresh >= self.min_refresh_interval
+            )
+
+    def _refresh_locked(self):
+        # Se llama con `_refresh_lock`: lee de la base sin `_lock` y aplica
+        # lo leído con `_lock`
+        with self._lock:
+            loaded = self._loaded
+            watermark = self._watermark
+            pending, self._pending_ids = self._pending_ids, set()
+            reconcile = (
+                loaded
+                and time.monotonic() - self._last_reconcile >= self.reconcile_interval
+            )
+            known = set(self._rows) if watermark is None or reconcile else None
+            self._deleted_while_fetching = set()
+            self._fetching = True
+            self._stale = False
+        try:
+            if not loaded:
+                rows = list(self.crud.iter_creyentes())
+                existing = None
+            else:
+                rows, existing = self._fetch_changes(
+                    watermark, pending, known, reconcile
+                )
+        except Exception:
+            with self._lock:
+                self._pending_ids.update(pending)
+                self._fetching = False
+                self._stale = True
+            raise
+
+        events: List[Tuple[str, Dict[int, Dict[str, Any]]]] = []
+        deltas: Dict[int, Tuple[Any, Any]] = {}
+        with self._lock:
+            self._fetching = False
+            # Lo borrado por el CRUD durante la consulta no se vuelve a agregar
+            deleted = self._deleted_while_fetching
+            rows = [row for row in rows if row["Id"] not in deleted]
+            if not loaded:
+                self._full_load(rows)
+            else:
+                events.append(("update", self._merge(rows, deltas)))
+                if existing is not None:
+                    events.append(("delete", self._remove_missing(existing, deltas)))
+                    self._last_reconcile = time.monotonic()
+                if deltas:
+                    self._version += 1
+            self._last_refresh = time.monotonic()
+            version = self._version
+        return events, deltas, version
+
+    def _notify(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        if not changes:
+            return
+        for callback in self._listeners:
+            try:
+                callback(event, changes)
+            except Exception as e:
+                self.logger.error("Error notificando %s a %s: %s", event, callback, e)
+
+    def _notify_deltas(self, deltas: Dict[int, Tuple[Any, Any]], version: int) -> None:
+        if not deltas:
+            return
+        for callback in self._delta_listeners:
+            try:
+                callback(deltas, version)
+            except Exception as e:
+                self.logger.error("Error notificando cambios a %s: %s", callback, e)
+
+    def _full_load(self, rows: List[Dict[str, Any]]) -> None:
+        by_id: Dict[int, Dict[str, Any]] = {}
+        watermark = None
+        for row in rows:
+            by_id[row["Id"]] = row
+            watermark = self._max_watermark(watermark, row.get("fe_us_mo"))
+        self._rows = by_id
+        self._watermark = watermark
+        self._loaded = True
+        self._last_reconcile = time.monotonic()
+        self._version += 1
+        self.logger.info("Snapshot cargado: %d filas (v%d)", len(by_id), self._version)
+
+    def _fetch_changes(
+        self,
+        watermark: Optional[datetime],
+        pending: Set[int],
+        known: Optional[Set[int]],
+        reconcile: bool,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Set[int]]]:
+        """
+        Lee de la base (sin lock) las filas modificadas desde la marca de
+        agua, las pendientes por Id y, si toca reconciliar, la lista de Ids
+        existentes; devuelve `(filas, Ids existentes o None)`.
+        """
+        pending = set(pending)
+        if watermark is None:
+            # Sin marca de agua (tabla vacía o sin fe_us_mo): se buscan por Id
+            pending.update(i for i in self.crud.list_ids() if i not in known)
+            changed: List[Dict[str, Any]] = []
+        else:
+            # Las filas re-leídas dentro del margen e iguales no generan cambios
+            since = watermark - timedelta(seconds=self.watermark_lag)
+            changed = list(self.crud.list_modified_since(since))
+        existing = None
+        if reconcile:
+            # Después de `changed`: lo que se confirme entre ambas consultas
+            # aparece como faltante y se lee por Id
+            existing = set(self.crud.list_ids())
+            pending.update(existing.difference(known))
+        pending.difference_update(row["Id"] for row in changed)
+        if pending:
+            changed.extend(self.crud.list_by_ids(sorted(pending)))
+        return changed, existing
+
+    def _merge(
+        self, rows: List[Dict[str, Any]], deltas: Dict[int, Tuple[Any, Any]]
+    ) -> Dict[int, Dict[str, Any]]:
+        merged = {}
+        watermark = self._watermark
+        for row in rows:
+            previous = self._rows.get(row["Id"])
+            if previous != row:
+                self._rows[row["Id"]] = row
+                merged[row["Id"]] = row
+                deltas[row["Id"]] = (previous, row)
+            watermark = self._max_watermark(watermark, row.get("fe_us_mo"))
+        self._watermark = watermark
+        return merged
+
+    def _remove_missing(
+        self, existing: Set[int], deltas: Dict[int, Tuple[Any, Any]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Quita las filas cuyo Id ya no existe en la base; devuelve los borrados."""
+        removed = [i for i in self._rows if i not in existing]
+        for i in removed:
+            deltas[i] = (self._rows.pop(i), None)
+        if removed:
+            self.logger.info("Snapshot: %d borrados reconciliados", len(removed))
+        return {i: {} for i in removed}
+
+    def _on_write(self, event: str, changes: Dict[int, Dict[str, Any]]) -> None:
+        deltas: Dict[int, Tuple[Any, Any]] = {}
+        with self._lock:
+            if event == "delete":
+                for i in changes:
+                    self._pending_ids.discard(i)
+                    if self._fetching:
+                        self._deleted_while_fetching.add(i)
+                    previous = self._rows.pop(i, None)
+                    if previous is not None:
+                        deltas[i] = (previous, None)
+                if deltas:
+                    self._version += 1
+            else:
+                # Las altas y cambios se leen por Id en el próximo refresh
+                self._pending_ids.update(int(i) for i in changes)
+                self._stale = True
+            version = self._version
+        self._notify_deltas(deltas, version)
+
+    @staticmethod
+    def _max_watermark(current, value):
+        if value is None:
+            return current
+        if current is None or value > current:
+            return value
+        return current
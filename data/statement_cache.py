@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+
+class StatementCache:
+    """
+    Caché LRU de textos SQL armados dinámicamente.
+
+    La clave es la operación más la tupla ordenada de columnas, de modo que
+    payloads con el mismo conjunto de columnas (p. ej. el formulario de
+    registro) reutilizan el mismo texto sin volver a construirlo.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._statements: "OrderedDict[Tuple[str, Tuple[str, ...]], str]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        operation: str,
+        columns: Tuple[str, ...],
+        builder: Callable[[Tuple[str, ...]], str],
+    ) -> str:
+        key = (operation, columns)
+        with self._lock:
+            query = self._statements.get(key)
+            if query is not None:
+                self._statements.move_to_end(key)
+                self.hits += 1
+                return query
+            self.misses += 1
+        query = builder(columns)
+        with self._lock:
+            self._statements[key] = query
+            if len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+        return query
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._statements),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
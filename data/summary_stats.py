@@ -0,0 +1,315 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from data.creyentes_crud import CreyentesCRUD
+from data.snapshot import CreyentesSnapshot
+
+
+def _texto(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip().upper()
+    return value or None
+
+
+def _entero(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        return int.from_bytes(value, "big")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _mes(column: str) -> Callable[[Dict[str, Any]], Optional[str]]:
+    def key(row: Dict[str, Any]) -> Optional[str]:
+        value = row.get(column)
+        if value is None or not hasattr(value, "strftime"):
+            return None
+        return value.strftime("%Y-%m")
+
+    return key
+
+
+# Clave de cada dimensión calculada sobre una fila, igual que su GROUP BY
+_KEYS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "CodRed": lambda r: _texto(r.get("CodRed")),
+    "Estatus": lambda r: _entero(r.get("Estatus")),
+    "Sexo": lambda r: _texto(r.get("Sexo")),
+    "EstadoCivil": lambda r: _texto(r.get("EstadoCivil")),
+    "Estado": lambda r: _texto(r.get("Estado")),
+    "Ciudad": lambda r: _texto(r.get("Ciudad")),
+    "MesIngreso": _mes("FechaIngreso"),
+    "MesRegistro": _mes("fe_us_in"),
+}
+# Cómo normalizar los valores que devuelve el GROUP BY
+_SQL_VALUES: Dict[str, Callable[[Any], Any]] = {
+    "Estatus": _entero,
+    "MesIngreso": lambda v: v,
+    "MesRegistro": lambda v: v,
+}
+
+
+@dataclass(frozen=True)
+class Summary:
+    """Conteos `{dimension: ((valor, total), ...)}` ordenados por valor."""
+
+    total: int
+    counts: Dict[str, Tuple[Tuple[Any, int], ...]]
+    loaded_at: float
+
+
+class _IncrementalStats(ABC):
+    """
+    Base de los agregados mantenidos con los deltas del snapshot.
+
+    Si el snapshot ya está cargado, los agregados se calculan sobre una vista
+    de versión `v` y solo se aplican los deltas de versiones posteriores, así
+    ninguna escritura se cuenta dos veces. Si todavía no se cargó, no se
+    fuerza su carga: se usa un GROUP BY en la base como valor provisional,
+    que se reemplaza por el cálculo sobre las filas en cuanto el snapshot
+    esté disponible. Cada `rebuild_interval` segundos se recalcula.
+    """
+
+    def __init__(
+        self,
+        crud: CreyentesCRUD,
+        snapshot: CreyentesSnapshot,
+        rebuild_interval: float = 3600.0,
+    ):
+        self.crud = crud
+        self.snapshot = snapshot
+        self.rebuild_interval = rebuild_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._ready = False
+        # Versión del snapshot incluida; None si viene del GROUP BY
+        self._base_version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._result: Any = None
+        snapshot.add_delta_listener(self._on_delta)
+
+    def get(self) -> Any:
+        if self.snapshot.loaded:
+            # Trae al snapshot los cambios pendientes; llegan por _on_delta
+            self.snapshot.refresh()
+        with self._lock:
+            vencido = time.monotonic() - self._loaded_at > self.rebuild_interval
+            # La vista se toma con el lock: los deltas posteriores esperan
+            view = self.snapshot.current()
+            if view is not None and (self._base_version is None or vencido):
+                self._load_view(view)
+            elif not self._ready or (view is None and vencido):
+                self._load_sql()
+            if self._result is None:
+                self._result = self._build()
+            return self._result
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._ready = False
+            self._base_version = None
+            self._result = None
+
+    def _load_view(self, view) -> None:
+        inicio = time.perf_counter()
+        self._reset()
+        for row in view.rows:
+            self._apply(row, 1)
+        self._loaded(view.version, inicio, "snapshot")
+
+    def _load_sql(self) -> None:
+        inicio = time.perf_counter()
+        self._reset()
+        self._load_from_db()
+        self._loaded(None, inicio, "base de datos")
+
+    def _loaded(self, version: Optional[int], inicio: float, origen: str) -> None:
+        self._ready = True
+        self._base_version = version
+        self._loaded_at = time.monotonic()
+        self._result = None
+        self.logger.info(
+            "Agregados calculados desde %s en %.2fs",
+            origen,
+            time.perf_counter() - inicio,
+        )
+
+    def _on_delta(self, deltas: Dict[int, Tuple[Any, Any]], version: int) -> None:
+        with self._lock:
+            # Provisionales (GROUP BY) o ya incluidos en la vista: se ignoran
+            if (
+                not self._ready
+                or self._base_version is None
+                or version <= self._base_version
+            ):
+                return
+            for previous, current in deltas.values():
+                if previous is not None:
+                    self._apply(previous, -1)
+                if current is not None:
+                    self._apply(current, 1)
+            self._result = None
+
+    # A implementar por cada agregado (con el lock tomado)
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """Deja los contadores en cero."""
+
+    @abstractmethod
+    def _load_from_db(self) -> None:
+        """Carga los contadores con GROUP BY (valor provisional)."""
+
+    @abstractmethod
+    def _apply(self, row: Dict[str, Any], sign: int) -> None:
+        """Suma (`sign=1`) o resta (`sign=-1`) una fila a los contadores."""
+
+    @abstractmethod
+    def _build(self) -> Any:
+        """Resultado inmutable que devuelve `get` a partir de los contadores."""
+
+
+class SummaryStats(_IncrementalStats):
+    """
+    Agregados de `tbl_creyentes` por Red, Estatus, Sexo, Estado civil,
+    Estado, Ciudad y mes de ingreso/registro, compartidos por el proceso.
+
+    Se calculan una vez y después se ajustan con los cambios fila a fila
+    que publica el snapshot (`add_delta_listener`): cada alta suma, cada
+    borrado resta y cada cambio resta la fila anterior y suma la nueva.
+    Leerlos cuesta lo mismo sin importar cuántos creyentes haya.
+    """
+
+    DIMENSIONS = tuple(_KEYS)
+
+    def get(self) -> Summary:
+        return super().get()
+
+    def _reset(self) -> None:
+        self._counts: Dict[str, Counter] = {d: Counter() for d in self.DIMENSIONS}
+        self._total = 0
+
+    def _load_from_db(self) -> None:
+        for dimension in self.DIMENSIONS:
+            normalize = _SQL_VALUES.get(dimension, _texto)
+            counter = self._counts[dimension]
+            for row in self.crud.count_by(dimension):
+                counter[normalize(row["valor"])] += int(row["total"])
+        self._total = sum(self._counts[self.DIMENSIONS[0]].values())
+
+    def _build(self) -> Summary:
+        return Summary(
+            total=self._total,
+            counts={
+                d: tuple(sorted(c.items(), key=self._sort_key))
+                for d, c in self._counts.items()
+            },
+            loaded_at=self._loaded_at,
+        )
+
+    @staticmethod
+    def _sort_key(item: Tuple[Any, int]) -> Tuple[bool, str]:
+        # Los valores vacíos al final
+        return item[0] is None, str(item[0])
+
+    def _apply(self, row: Dict[str, Any], sign: int) -> None:
+        self._total += sign
+        for dimension, key in _KEYS.items():
+            counter = self._counts[dimension]
+            value = key(row)
+            counter[value] += sign
+            if counter[value] <= 0:
+                del counter[value]
+
+
+# Etapas del embudo en orden: (columna, etiqueta)
+FUNNEL_STAGES = (
+    ("Encuentro", "Encuentro"),
+    ("Consolidacion", "Consolidación"),
+    ("Academia", "Academia"),
+    ("Lanzamiento", "Lanzamiento"),
+)
+_FUNNEL_FIELDS = ("total",) + tuple(c for c, _ in FUNNEL_STAGES) + ("Bautizo",)
+
+
+def _funnel_row(row: Dict[str, Any]) -> Tuple[int, ...]:
+    """Aporte de una fila a cada contador del embudo (1 o 0)."""
+    return (
+        (1,)
+        + tuple(int(_entero(row.get(c)) == 1) for c, _ in FUNNEL_STAGES)
+        + (int(row.get("FechaBautizo") is not None),)
+    )
+
+
+@dataclass(frozen=True)
+class Funnel:
+    """
+    Embudo de discipulado. `stages` trae `(etiqueta, cantidad, tasa)` por
+    etapa, donde la tasa es sobre la etapa anterior (la primera, sobre el
+    total); `by_red` trae los mismos contadores por CodRed.
+    """
+
+    total: int
+    stages: Tuple[Tuple[str, int, float], ...]
+    bautizados: int
+    by_red: Dict[Optional[str], Dict[str, int]]
+
+
+class FunnelStats(_IncrementalStats):
+    """
+    Contadores del embudo Encuentro -> Consolidación -> Academia ->
+    Lanzamiento (y bautizados), en total y por red.
+
+    Igual que `SummaryStats`: se calculan una vez (provisionalmente con
+    `funnel_counts` si el snapshot no está cargado) y se ajustan con los
+    deltas del snapshot, así que `get()` no recorre filas.
+    """
+
+    def get(self) -> Funnel:
+        return super().get()
+
+    def _reset(self) -> None:
+        self._by_red: Dict[Optional[str], List[int]] = {}
+
+    def _load_from_db(self) -> None:
+        for row in self.crud.funnel_counts():
+            red = _texto(row["CodRed"])
+            counts = self._by_red.setdefault(red, [0] * len(_FUNNEL_FIELDS))
+            for i, name in enumerate(_FUNNEL_FIELDS):
+                counts[i] += int(row[name] or 0)
+
+    def _build(self) -> Funnel:
+        totals = [sum(col) for col in zip(*self._by_red.values())] or [0] * len(
+            _FUNNEL_FIELDS
+        )
+        stages = []
+        previous = totals[0]
+        for i, (_, label) in enumerate(FUNNEL_STAGES, start=1):
+            rate = totals[i] / previous if previous else 0.0
+            stages.append((label, totals[i], rate))
+            previous = totals[i]
+        return Funnel(
+            total=totals[0],
+            stages=tuple(stages),
+            bautizados=totals[-1],
+            by_red={
+                red: dict(zip(_FUNNEL_FIELDS, counts))
+                for red, counts in self._by_red.items()
+                if counts[0] > 0
+            },
+        )
+
+    def _apply(self, row: Dict[str, Any], sign: int) -> None:
+        counts = self._by_red.setdefault(
+            _texto(row.get("CodRed")), [0] * len(_FUNNEL_FIELDS)
+        )
+        for i, value in enumerate(_funnel_row(row)):
+            counts[i] += sign * value
@@ -3,6 +3,8 @@ from time import sleep
 import streamlit as st
 from streamlit.runtime.scriptrunner import get_script_run_ctx
 
+from data.logging_setup import configure_logging
+
 
 def get_current_page_name():
     ctx = get_script_run_ctx()
@@ -13,6 +15,8 @@ def get_current_page_name():
 
 
 def make_sidebar():
+    # Por si se entra directo a una página sin pasar por app.py
+    configure_logging()
     with st.sidebar:
         # Centrar el título
         # quitar margenes
@@ -29,6 +33,14 @@ def make_sidebar():
         st.markdown("---")
 
         if st.session_state.get("logged_in", False):
+            # Sesión verificada por token: no se vuelve a pedir la contraseña
+            if "auth_cache" in st.session_state and (
+                st.session_state.auth_cache.verify_token(
+                    st.session_state.get("token_sesion")
+                )
+                is None
+            ):
+                logout()
             _extracted_from_make_sidebar()
         elif get_current_page_name() != "inicio":
             # If anyone tries to access a secret page without being logged in,
@@ -38,11 +50,31 @@ def make_sidebar():
 
 # TODO Rename this here and in `make_sidebar`
 def _extracted_from_make_sidebar():
+    usuario = st.session_state.get("user")
+    if "permisos" in st.session_state:
+        # Permisos compilados: al vencer o invalidarse se releen en segundo
+        # plano y mientras tanto se usan los que ya tiene la sesión
+        role_manager = st.session_state.role_manager
+        st.session_state.rol_user = st.session_state.permisos.get(
+            usuario,
+            loader=lambda: role_manager.load_user_by_username(usuario),
+            default=st.session_state.rol_user,
+        )
+    puede_crear = st.session_state.rol_user.has_permission("Creyentes", "create")
+    puede_leer = st.session_state.rol_user.has_permission("Creyentes", "read")
+    if "cache_app" in st.session_state:
+        # Si cambiaron los permisos se descarta solo la caché de este usuario
+        st.session_state.cache_app.bind_user(
+            usuario, getattr(st.session_state.rol_user, "granted", None)
+        )
+
     st.page_link("pages/page1.py", label="Inicio", icon=None)
-    if st.session_state.rol_user.has_permission("Creyentes", "create"):
+    if puede_crear:
         st.page_link("pages/page2.py", label="Registro", icon=None)
-    if st.session_state.rol_user.has_permission("Creyentes", "read"):
+        st.page_link("pages/page4.py", label="Importar", icon=None)
+    if puede_leer:
         st.page_link("pages/page3.py", label="Consultar datos", icon=None)
+        st.page_link("pages/page5.py", label="Estadísticas", icon=None)
 
     if st.button(
         "Cerrar sesión",
@@ -50,10 +82,36 @@ def _extracted_from_make_sidebar():
     ):
         logout()
 
-    st.cache_data.clear()
+
+def esperar_datos(*tareas):
+    # Espera las cargas iniciales lanzadas al iniciar sesión (app.py)
+    bootstrap = st.session_state.get("bootstrap")
+    if bootstrap is None:
+        return
+    pendientes = [t for t in tareas if not bootstrap.done(t)]
+    if not pendientes:
+        return
+    with st.spinner("Cargando datos..."):
+        for tarea in pendientes:
+            bootstrap.wait(tarea)
+
+
+def descartar_exportacion():
+    # Los archivos exportados tienen datos personales: no sobreviven la sesión
+    archivo = st.session_state.pop("archivo_exportado", None)
+    if archivo is not None:
+        archivo["archivo"].close()
 
 
 def logout():
+    descartar_exportacion()
+    if "permisos" in st.session_state:
+        # El próximo uso relee el rol: toma los cambios hechos durante la sesión
+        st.session_state.permisos.invalidate(st.session_state.get("user"))
+    if "cache_app" in st.session_state:
+        st.session_state.cache_app.invalidate_user(st.session_state.get("user"))
+    if "auth_cache" in st.session_state:
+        st.session_state.auth_cache.revoke(st.session_state.pop("token_sesion", None))
     st.session_state.logged_in = False
     st.session_state.stage = 0
     st.info("Se ha cerrado la sesión con éxito!")
@@ -1,14 +1,43 @@
 import streamlit as st
 import streamlit.components.v1 as components
 
-from helpers.navigation import make_sidebar
+from helpers.navigation import esperar_datos, make_sidebar
 
 st.set_page_config(page_title="Inicio", layout="wide", page_icon="")
 
 make_sidebar()
 
 
-def mostrar_fase_ganar():
+def html_embudo(embudo):
+    # Contadores ya agregados: el costo no depende de la cantidad de creyentes
+    pasos = [
+        f"""
+        <div class="stage">
+            <div class="stage-count">{embudo.total:,}</div>
+            <div class="stage-label">Ganados</div>
+        </div>"""
+    ]
+    for etiqueta, cantidad, tasa in embudo.stages:
+        pasos.append(
+            f"""
+        <i class="fas fa-chevron-right text-slate-300"></i>
+        <div class="stage">
+            <div class="stage-count">{cantidad:,}</div>
+            <div class="stage-label">{etiqueta}</div>
+            <div class="stage-rate">{tasa:.0%}</div>
+        </div>"""
+        )
+    pasos.append(
+        f"""
+        <div class="stage stage-extra">
+            <div class="stage-count">{embudo.bautizados:,}</div>
+            <div class="stage-label">Bautizados</div>
+        </div>"""
+    )
+    return f'<div class="funnel">{"".join(pasos)}</div>'
+
+
+def mostrar_fase_ganar(embudo=None):
     st.title("Visualización de Estrategia")
 
     # Código HTML/CSS/JS con el flujo completo pero enfoque en "Ganar"
@@ -100,6 +129,24 @@ def mostrar_fase_ganar():
                 font-weight: 600;
             }
 
+            .funnel {
+                display: flex;
+                align-items: center;
+                justify-content: space-between;
+                gap: 8px;
+                margin-top: 16px;
+                padding: 12px 16px;
+                background: #f8fafc;
+                border-radius: 16px;
+                border: 1px solid #e2e8f0;
+            }
+
+            .stage { text-align: center; min-width: 70px; }
+            .stage-extra { border-left: 1px dashed #cbd5e1; padding-left: 12px; }
+            .stage-count { font-size: 1.1rem; font-weight: 700; color: #1e3a8a; }
+            .stage-label { font-size: 0.65rem; text-transform: uppercase; color: #64748b; font-weight: 600; }
+            .stage-rate { font-size: 0.65rem; color: #3b82f6; font-weight: 600; }
+
             .content-card {
                 background: white;
                 padding: 24px;
@@ -174,15 +221,50 @@ def mostrar_fase_ganar():
                 <i class="fas fa-hand-holding-heart"></i>
             </div>
         </div>
+        <!--EMBUDO-->
     </body>
     </html>
     """
+    if embudo is not None:
+        html_code = html_code.replace("<!--EMBUDO-->", html_embudo(embudo))
 
     # Renderizar el componente en Streamlit
-    components.html(html_code, height=450)
+    components.html(html_code, height=450 if embudo is None else 560)
+
+
+esperar_datos("embudo")
+embudo = (
+    st.session_state.embudo_creyentes.get()
+    if "embudo_creyentes" in st.session_state
+    else None
+)
+mostrar_fase_ganar(embudo)
 
+if embudo is not None and embudo.by_red:
+    with st.expander("Embudo de discipulado por red"):
+        from pandas import DataFrame
 
-mostrar_fase_ganar()
+        # Las redes del embudo vienen en mayúsculas: se normalizan las claves
+        redes_map = {
+            cod.upper(): nombre
+            for cod, nombre in st.session_state.lookup_cache.get().redes_map.items()
+        }
+        por_red = DataFrame.from_dict(embudo.by_red, orient="index")
+        por_red.index = [
+            f"{red} - {redes_map.get(red, '')}" if red else "Sin red"
+            for red in por_red.index
+        ]
+        por_red = por_red.rename(columns={"total": "Ganados"})
+        por_red["% Lanzamiento"] = (
+            por_red["Lanzamiento"] / por_red["Ganados"].where(por_red["Ganados"] > 0)
+        ).fillna(0.0)
+        st.dataframe(
+            por_red.sort_values("Ganados", ascending=False),
+            column_config={
+                "% Lanzamiento": st.column_config.NumberColumn(format="percent")
+            },
+            use_container_width=True,
+        )
 
 with st.expander(
     "Para registrar la información de un nuevo creyente, sigue estos pasos:"
@@ -1,8 +1,10 @@
-from datetime import date, datetime
+from datetime import date, datetime, time, timedelta
 
 import streamlit as st
 
-from helpers.navigation import make_sidebar
+from data.duplicate_finder import DuplicateFinder
+from data.scoped_cache import dataset_scope
+from helpers.navigation import esperar_datos, make_sidebar
 
 st.set_page_config(page_title="Registro de nuevo creyente", layout="wide", page_icon="")
 
@@ -12,7 +14,7 @@ st.title("Datos del nuevo creyente")
 
 
 def actualizar_listado():
-    st.session_state.lista_creyentes = st.session_state.creyentes_crud.list()
+    st.session_state.snapshot_creyentes.refresh(force=True)
 
 
 if st.button("Refrescar"):
@@ -27,15 +29,7 @@ def set_stage(i):
 
 
 def get_default_profesion_option():
-    lista_profesiones = st.session_state.get("lista_profesiones", [])
-    pares_codigo_nombre = [
-        f"{d['IdProfesion']}|{d['DescripcionProfesion'].strip()}"
-        for d in lista_profesiones
-    ]
-    for opcion in pares_codigo_nombre:
-        if opcion.split("|", 1)[1].upper() == "SIN ASIGNAR":
-            return opcion
-    return pares_codigo_nombre[0] if pares_codigo_nombre else None
+    return st.session_state.lookup_cache.get().profesion_default
 
 
 def reset_nuevo_creyente_controles():
@@ -95,6 +89,8 @@ if "conexion" not in st.session_state or st.session_state.conexion is None:
     )
     st.stop()
 
+esperar_datos("lookups", "cedulas")
+
 # Formulario de creación
 if st.session_state.stage2 >= 1:
     # con icono de nuevo registro asterisco verde
@@ -165,11 +161,8 @@ if st.session_state.stage2 >= 1:
                 max_chars=40,
             ).lower()
 
-        lista_profesiones = st.session_state.get("lista_profesiones", [])
-        pares_codigo_nombre = [
-            (str(d["IdProfesion"]) + "|" + d["DescripcionProfesion"].strip())
-            for d in lista_profesiones
-        ]
+        lookups = st.session_state.lookup_cache.get()
+        pares_codigo_nombre = list(lookups.opciones_profesiones)
         default_profesion = get_default_profesion_option()
         if (
             default_profesion is not None
@@ -187,10 +180,7 @@ if st.session_state.stage2 >= 1:
             "Ocupación", key="txt_ocupacion", max_chars=20
         ).upper()
 
-        lista_redes = st.session_state.get("lista_redes", [])
-        pares_codigo_nombre = [
-            (d["CodRed"] + "|" + d["NombreRed"].strip()) for d in lista_redes
-        ]
+        pares_codigo_nombre = list(lookups.opciones_redes)
 
         estado_civil = st.selectbox(
             "Estado Civil",
@@ -261,6 +251,17 @@ if st.session_state.stage2 >= 1:
                 st.error(f"Completa los campos obligatorios: {', '.join(faltantes)}")
                 st.stop()
 
+            crud = st.session_state.creyentes_crud
+            # Validación en memoria; solo se lee la fila si la cédula ya existe
+            if crud.cedulas.contains(cedula):
+                existente = crud.get_by_cedula(cedula.strip()) or {}
+                st.error(
+                    f"La cédula {cedula} ya está registrada a nombre de "
+                    f"{existente.get('Nombre', '')} {existente.get('Apellido', '')} "
+                    f"(Id {existente.get('Id', '?')})."
+                )
+                st.stop()
+
             payload = {
                 "Cedula": cedula,
                 "Nacionalidad": nacionalidad,
@@ -310,142 +311,134 @@ def build_creyentes_df(rows):
     return df
 
 
-def process_editor_changes(edited_df, original_df):
+def diff_editor_changes(edited_df, original_df, filas_editadas=None):
     """
-    Procesa cambios del data_editor.
-    - Detecta filas con 'Eliminar' == True y llama a delete(id).
-    - Detecta filas editadas (comparando por Id) y llama a update(id, payload).
-    - Actualiza el listado en session_state y fuerza rerun cuando hay cambios.
+    Compara el editor contra el original indexando ambos por Id y devuelve
+    solo las celdas cambiadas como `{Id: {columna: valor_nuevo}}`.
+
+    `filas_editadas` son las posiciones que el data_editor reporta en
+    `edited_rows`; si se indican, solo se comparan esas filas.
     """
-    from pandas import isna, Timestamp
+    from pandas import isna
 
+    # Ignorar columnas de control
+    cols = [
+        c
+        for c in edited_df.columns
+        if c not in {"Id", "Eliminar"} and c in original_df.columns
+    ]
+    if filas_editadas is not None:
+        edited_df = edited_df.iloc[sorted(filas_editadas)]
+    if edited_df.empty or not cols:
+        return {}
+
+    nuevo = edited_df.set_index("Id")[cols]
+    # Filas nuevas o no encontradas en el original se ignoran
+    nuevo = nuevo[nuevo.index.isin(original_df["Id"])]
+    viejo = original_df.set_index("Id")[cols].reindex(nuevo.index)
+
+    ambos_nulos = nuevo.isna() & viejo.isna()
+    cambiado = nuevo.ne(viejo) & ~ambos_nulos
+    celdas = cambiado.stack()
+    celdas = celdas[celdas]
+
+    cambios = {}
+    for id_val, col in celdas.index:
+        valor = nuevo.at[id_val, col]
+        if isna(valor):
+            valor = None
+        elif col == "FechaNac" and isinstance(valor, datetime):
+            valor = valor.date()
+        elif isinstance(valor, str):
+            # Normalizar valores a mayúsculas si es string
+            valor = valor.upper()
+        elif hasattr(valor, "item"):
+            # Escalares numpy a tipos nativos para el driver
+            valor = valor.item()
+        cambios.setdefault(int(id_val), {})[col] = valor
+    return cambios
+
+
+def process_editor_changes(edited_df, original_df, filas_editadas=None):
+    """
+    Procesa cambios del data_editor.
+    - Detecta filas con 'Eliminar' == True y las marca para borrado.
+    - Calcula las celdas editadas con `diff_editor_changes` y arma su payload.
+    - Aplica borrados y actualizaciones en una sola transacción y fuerza
+      rerun cuando hay cambios.
+    """
     if edited_df is None or edited_df.empty:
         return
 
-    any_deleted = False
-    any_updated = False
-
     # Manejar eliminaciones
+    to_delete = []
     if "Eliminar" in edited_df.columns:
-        to_delete = edited_df.loc[edited_df["Eliminar"], "Id"].tolist()
-        if to_delete:
-            for id_val in to_delete:
-                try:
-                    id_int = int(id_val)
-                except Exception:
-                    st.error(f"Id inválido para eliminar: {id_val}")
-                    continue
-                try:
-                    deleted = st.session_state.creyentes_crud.delete(id_int)
-                except Exception as e:
-                    st.error(f"Error eliminando Id {id_int}: {e}")
-                    deleted = False
-                if deleted:
-                    st.success(f"Registro {id_int} eliminado")
-                    any_deleted = True
-                else:
-                    st.error(f"No se pudo eliminar Id {id_int}")
-
-    # Manejar actualizaciones (comparar fila por Id)
-    # Ignorar columnas de control
-    ignore_cols = {"Id", "Eliminar"}
-    for _, row in edited_df.iterrows():
-        id_val = row.get("Id", None)
-        if id_val is None:
-            continue
-        try:
-            id_int = int(id_val)
-        except Exception:
-            st.error(f"Id inválido en edición: {id_val}")
+        for id_val in edited_df.loc[edited_df["Eliminar"], "Id"].tolist():
+            try:
+                to_delete.append(int(id_val))
+            except Exception:
+                st.error(f"Id inválido para eliminar: {id_val}")
+
+    # Manejar actualizaciones (solo celdas cambiadas, comparando por Id)
+    cambios = diff_editor_changes(edited_df, original_df, filas_editadas)
+    originales = original_df.set_index("Id")
+    to_update = {}
+    for id_int, payload in cambios.items():
+        if id_int in to_delete:
             continue
+        # Añadir campos requeridos por normalize_payload / update
+        payload["co_us_mo"] = st.session_state.get("user", 0)
+        # Mantener fecha y usuario de creación original
+        payload["fe_us_in"] = originales.at[id_int, "fe_us_in"]
+        payload["co_us_in"] = originales.at[id_int, "co_us_in"]
+        to_update[id_int] = st.session_state.creyentes_crud.normalize_payload(
+            payload
+        )
 
-        orig_rows = original_df[original_df["Id"] == id_int]
-        if orig_rows.empty:
-            # fila nueva o no encontrada en original; saltar
-            continue
-        orig = orig_rows.iloc[0]
-
-        payload = {}
-        changed = False
-
-        for col in edited_df.columns:
-            if col in ignore_cols:
-                continue
-            # Si columna no está en original, comparar igual (puede ser nueva columna)
-            new_val = row[col]
-            old_val = orig.get(col, None) if col in orig.index else None
-
-            # Normalizar NaN/NAT
-            if isna(old_val):
-                old_val = None
-            if isna(new_val):
-                new_val = None
-
-            # Normalizar datetime-like a date (si la columna FechaNac viene como Timestamp)
-            if col == "FechaNac" and new_val is not None:
-                if isinstance(new_val, (Timestamp, datetime)):
-                    new_val = new_val.date()
-                # si old_val es Timestamp, convertir para comparación
-                if isinstance(old_val, (Timestamp, datetime)):
-                    old_val = old_val.date()
-
-            # Mapear boolean-like (p. ej. Encuentro) a boolean
-            if isinstance(new_val, (str,)) and new_val.lower() in {"true", "false"}:
-                new_val = True if new_val.lower() == "true" else False
-
-            # Comparar
-            if old_val != new_val:
-                # Normalizar valores a mayúsculas si es string
-                payload[col] = new_val.upper() if isinstance(new_val, str) else new_val
-                changed = True
-
-        if changed:
-            # Añadir campos requeridos por normalize_payload / update
-            payload["co_us_mo"] = st.session_state.get("user", 0)
-            # Asegurar FechaNac en payload (puede ser None)
-            payload.setdefault("FechaNac", payload.get("FechaNac", None))
-            # Mantener fecha de creación original
-            payload["fe_us_in"] = row["fe_us_in"]
-            # Mantener usuario de creación original
-            payload["co_us_in"] = row["co_us_in"]
+    if not to_delete and not to_update:
+        return
 
-            try:
-                safe = st.session_state.creyentes_crud.normalize_payload(payload)
-                updated = st.session_state.creyentes_crud.update(id_int, safe)
-            except Exception as e:
-                st.error(f"Error actualizando Id {id_int}: {e}")
-                updated = False
-
-            if updated:
-                st.success(f"Id {id_int} actualizado")
-                any_updated = True
-            else:
-                st.error(f"No se pudo actualizar Id {id_int}")
+    # Un solo viaje a la base de datos para todos los cambios
+    try:
+        updated, deleted = st.session_state.creyentes_crud.apply_changes(
+            updates=to_update, deletes=to_delete
+        )
+    except Exception as e:
+        st.error(f"Error guardando cambios: {e}")
+        return
+
+    if not updated and not deleted:
+        st.error("No se pudieron guardar los cambios.")
+        return
+    if deleted:
+        st.success(f"Registros eliminados: {', '.join(map(str, to_delete))}")
+    if updated:
+        st.success(f"Registros actualizados: {', '.join(map(str, to_update))}")
 
     # Si hubo cambios (borrados o actualizaciones), refrescar listado y recargar la página
-    if any_deleted or any_updated:
-        actualizar_listado()
-        st.rerun()
+    actualizar_listado()
+    st.rerun()
 
 
 def render_creyentes_editor():
-    rows = st.session_state.lista_creyentes or []
-    if not rows:
-        st.warning("No se encontraron registros.")
-        return
-
-    # Filtrar sin usar pandas por columna fe_us_in para mostrar solo los registros creados hoy
+    # Solo los registros creados o modificados hoy, resueltos por índice en la BD.
+    # Se cachean por día hasta la próxima escritura en tbl_creyentes
     hoy = date.today()
-    rows = [
-        row
-        for row in rows
-        if "fe_us_in" in row
-        and row["fe_us_mo"] is not None
-        and row["fe_us_mo"].date() == hoy
-    ]
+    inicio = datetime.combine(hoy, time.min)
+    rows = st.session_state.cache_app.get_or_load(
+        dataset_scope(),
+        "editor_hoy",
+        hoy,
+        lambda: tuple(
+            st.session_state.creyentes_crud.list_modified_between(
+                inicio, inicio + timedelta(days=1)
+            )
+        ),
+        ttl=60.0,
+    )
 
     if not rows:
-        st.info("No hay registros creados hoy.")
+        st.info("No hay registros creados o modificados hoy.")
         return
 
     df = build_creyentes_df(rows)
@@ -453,6 +446,7 @@ def render_creyentes_editor():
 
     edited = st.data_editor(
         df,
+        key="editor_creyentes",
         column_config={
             "Consolidacion": st.column_config.CheckboxColumn(
                 "Consolidación?",
@@ -504,10 +498,55 @@ def render_creyentes_editor():
         hide_index=True,
     )
 
-    process_editor_changes(edited, original_df)
+    # El estado del editor trae solo las filas tocadas: {posición: {col: valor}}
+    estado_editor = st.session_state.get("editor_creyentes") or {}
+    filas_editadas = [int(i) for i in estado_editor.get("edited_rows", {})]
+    process_editor_changes(edited, original_df, filas_editadas)
+
+
+@st.cache_resource(max_entries=1, show_spinner="Buscando posibles duplicados...")
+def buscar_duplicados(version, _vista):
+    # Una búsqueda por versión del snapshot, compartida por todas las sesiones
+    return DuplicateFinder().find(_vista.rows)
+
+
+def render_posibles_duplicados():
+    st.caption(
+        "Pares de registros que podrían ser la misma persona (nombre parecido, "
+        "misma fecha de nacimiento o mismo teléfono), del más al menos probable."
+    )
+    if not st.session_state.get("mostrar_duplicados"):
+        if st.button("Buscar duplicados"):
+            st.session_state.mostrar_duplicados = True
+            st.rerun()
+        return
+
+    vista = st.session_state.snapshot_creyentes.read()
+    pares = buscar_duplicados(vista.version, vista)
+    if pares.empty:
+        st.success("No se encontraron posibles duplicados.")
+        return
+    st.write(f"{len(pares)} pares candidatos")
+    st.dataframe(
+        pares,
+        column_config={
+            "FechaNac_a": st.column_config.DateColumn("FechaNac_a", format="DD-MM-YYYY"),
+            "FechaNac_b": st.column_config.DateColumn("FechaNac_b", format="DD-MM-YYYY"),
+            "similitud_nombre": st.column_config.ProgressColumn(
+                "Similitud nombre", min_value=0.0, max_value=1.0, format="%.2f"
+            ),
+            "puntaje": st.column_config.ProgressColumn(
+                "Puntaje", min_value=0.0, max_value=1.0, format="%.2f"
+            ),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
 
 
 # Replace the big if-body with a single call
 if st.session_state.rol_user.has_permission("Creyentes", "update"):
     with st.expander("✏️ Listado de creyentes (editor)"):
         render_creyentes_editor()
+    with st.expander("🔎 Posibles duplicados"):
+        render_posibles_duplicados()
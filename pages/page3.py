@@ -1,7 +1,11 @@
+import tempfile
+
 import streamlit as st
-from pandas import DataFrame, to_datetime
 
-from helpers.navigation import make_sidebar
+from data.exporter import EXPORT_FORMATS, CreyentesExporter
+from data.filter_engine import FilterEngine
+from data.scoped_cache import user_scope
+from helpers.navigation import descartar_exportacion, esperar_datos, make_sidebar
 
 st.set_page_config(page_title="Datos del creyente", layout="wide", page_icon="")
 
@@ -10,50 +14,79 @@ make_sidebar()
 st.title("Datos de creyentes")
 
 
-def estatus_a_num(value):
-    if value is None:
-        return None
-    if isinstance(value, bool):
-        return 1 if value else 0
-    value_str = str(value).strip().lower()
-    if value_str in {"1", "true", "t", "si", "sí", "activo"}:
-        return 1
-    if value_str in {"0", "false", "f", "no", "inactivo"}:
-        return 0
-    return None
-
-
-def actualizar_listado():
-    st.session_state.lista_creyentes = st.session_state.creyentes_crud.list(limit=500)
-
-
-def build_creyentes_df(rows):
-    df = DataFrame(rows) if rows else DataFrame()
-    if df.empty:
-        return df
+ESTADO_CIVIL_MAP = {
+    "S": "Soltero(a)",
+    "C": "Casado(a)",
+    "D": "Divorciado(a)",
+    "V": "Viudo(a)",
+    "U": "Unión de hecho",
+}
+ESTADO_CIVIL_CODIGOS = {texto: cod for cod, texto in ESTADO_CIVIL_MAP.items()}
+
+
+COLUMNAS_CONSULTA = [
+    "Id",
+    "Nacionalidad",
+    "Cedula",
+    "Nombre",
+    "Apellido",
+    "Sexo",
+    "FechaNac",
+    "TelefonoCelular",
+    "Correo",
+    "Ocupacion",
+    "CodRed",
+    "EstadoCivil",
+    "Estatus",
+    "fe_us_in",
+]
 
-    if "FechaNac" in df.columns:
-        df["FechaNac"] = to_datetime(df["FechaNac"], errors="coerce").dt.date
 
-    if "fe_us_in" in df.columns:
-        df["fe_us_in"] = to_datetime(df["fe_us_in"], errors="coerce")
+def agregar_estado_civil_texto(df):
+    # EstadoCivil llega como categórica: se renombran las categorías, no las filas
+    if "EstadoCivil" in df.columns and hasattr(df["EstadoCivil"], "cat"):
+        categorias = df["EstadoCivil"].cat.categories
+        df["EstadoCivilTexto"] = df["EstadoCivil"].cat.rename_categories(
+            [ESTADO_CIVIL_MAP.get(c, c) for c in categorias]
+        )
+    return df
 
-    if "fe_us_mo" in df.columns:
-        df["fe_us_mo"] = to_datetime(df["fe_us_mo"], errors="coerce")
 
-    if "EstadoCivil" in df.columns:
-        estado_civil_map = {
-            "S": "Soltero(a)",
-            "C": "Casado(a)",
-            "D": "Divorciado(a)",
-            "V": "Viudo(a)",
-            "U": "Unión de hecho",
-        }
-        df["EstadoCivilTexto"] = (
-            df["EstadoCivil"].map(estado_civil_map).fillna(df["EstadoCivil"])
+@st.cache_resource(max_entries=2, show_spinner=False)
+def obtener_motor_filtros(version, _vista, _indice):
+    # Un motor por versión del snapshot, compartido por todas las sesiones
+    return FilterEngine(_vista, COLUMNAS_CONSULTA, text_index=_indice)
+
+
+def exportar_resultado(motor, filtros, formato, total):
+    # Archivo temporal anónimo: en memoria hasta 32 MB y, si pasa a disco,
+    # sin nombre en el sistema de archivos; se libera al cerrarlo
+    descartar_exportacion()
+
+    mime, extension = EXPORT_FORMATS[formato]
+    barra = st.progress(0.0, text="Exportando...")
+    salida = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+    try:
+        # Mismo motor y filtros que la tabla: se exporta lo que se ve
+        filas = CreyentesExporter().export(
+            salida,
+            formato,
+            motor.iter_rows(filtros),
+            columns=COLUMNAS_CONSULTA,
+            total=total,
+            progress=lambda n, f: barra.progress(f, text=f"{n} filas exportadas"),
         )
-
-    return df
+    except Exception:
+        salida.close()
+        raise
+    finally:
+        barra.empty()
+    st.session_state.archivo_exportado = {
+        "archivo": salida,
+        "nombre": f"creyentes.{extension}",
+        "mime": mime,
+        "filas": filas,
+    }
 
 
 def limpiar_filtros(fecha_rango_default=None):
@@ -72,26 +105,24 @@ if "conexion" not in st.session_state or st.session_state.conexion is None:
     st.error("No hay conexión a la base de datos. Vuelve a Inicio para inicializarla.")
     st.stop()
 
-if "lista_creyentes" not in st.session_state:
-    actualizar_listado()
+esperar_datos("snapshot", "indice")
 
 if st.button("Refrescar datos"):
-    actualizar_listado()
+    st.session_state.snapshot_creyentes.refresh(force=True)
 
-rows = st.session_state.get("lista_creyentes", [])
-df = build_creyentes_df(rows)
+vista = st.session_state.snapshot_creyentes.read()
+motor = obtener_motor_filtros(vista.version, vista, st.session_state.indice_busqueda)
+total = len(motor)
 
-if df.empty:
+if not total:
     st.warning("No se encontraron registros de creyentes.")
     st.stop()
 
-lista_redes = st.session_state.get("lista_redes", [])
-redes_map = {str(r["CodRed"]): str(r["NombreRed"]).strip() for r in lista_redes}
+redes_map = st.session_state.lookup_cache.get().redes_map
 
 fecha_rango_default = None
-if "FechaNac" in df.columns and df["FechaNac"].notna().any():
-    fecha_min = df["FechaNac"].dropna().min()
-    fecha_max = df["FechaNac"].dropna().max()
+fecha_min, fecha_max = motor.fecha_nac_range()
+if fecha_min is not None and fecha_max is not None:
     fecha_rango_default = (fecha_min, fecha_max)
     if "filtro_fecha_nac" not in st.session_state:
         st.session_state.filtro_fecha_nac = fecha_rango_default
@@ -119,6 +150,8 @@ if "filtro_red" not in st.session_state:
     st.session_state.filtro_red = "Todas"
 if "filtro_estado_civil" not in st.session_state:
     st.session_state.filtro_estado_civil = []
+if "pagina_resultados" not in st.session_state:
+    st.session_state.pagina_resultados = 1
 
 with st.expander("Filtros", expanded=True):
     a1, a2 = st.columns([0.8, 0.2])
@@ -163,12 +196,7 @@ with st.expander("Filtros", expanded=True):
             key="filtro_red",
         )
     with c5:
-        if "EstadoCivilTexto" in df.columns:
-            estados_disponibles = sorted(
-                df["EstadoCivilTexto"].dropna().unique().tolist()
-            )
-        else:
-            estados_disponibles = []
+        estados_disponibles = list(ESTADO_CIVIL_MAP.values())
         st.session_state.filtro_estado_civil = [
             e for e in st.session_state.filtro_estado_civil if e in estados_disponibles
         ]
@@ -180,7 +208,6 @@ with st.expander("Filtros", expanded=True):
     with c6:
         fecha_nac_rango = None
         if fecha_rango_default is not None:
-            fecha_min, fecha_max = fecha_rango_default
             fecha_nac_rango = st.date_input(
                 "Rango fecha de nacimiento",
                 min_value=fecha_min,
@@ -191,58 +218,70 @@ with st.expander("Filtros", expanded=True):
         else:
             st.caption("Sin datos de fecha de nacimiento para filtrar")
 
-df_filtrado = df.copy()
-
-if texto_busqueda:
-    texto = texto_busqueda.lower()
-    columnas_busqueda = [
-        c
-        for c in ["Cedula", "Nombre", "Apellido", "Correo", "TelefonoCelular"]
-        if c in df_filtrado.columns
-    ]
-    if columnas_busqueda:
-        mask = False
-        for col in columnas_busqueda:
-            mask = mask | df_filtrado[col].astype(str).str.lower().str.contains(
-                texto, na=False
-            )
-        df_filtrado = df_filtrado[mask]
-
-if sexo != "Todos" and "Sexo" in df_filtrado.columns:
-    df_filtrado = df_filtrado[df_filtrado["Sexo"] == sexo]
-
-if estatus != "Todos" and "Estatus" in df_filtrado.columns:
-    estatus_objetivo = 1 if estatus == "Activo" else 0
-    df_filtrado = df_filtrado[
-        df_filtrado["Estatus"].apply(estatus_a_num) == estatus_objetivo
-    ]
-
-if red_seleccionada != "Todas" and "CodRed" in df_filtrado.columns:
-    cod = red_seleccionada.split(" - ", 1)[0]
-    df_filtrado = df_filtrado[df_filtrado["CodRed"].astype(str) == cod]
-
-if estado_civil and "EstadoCivilTexto" in df_filtrado.columns:
-    df_filtrado = df_filtrado[df_filtrado["EstadoCivilTexto"].isin(estado_civil)]
-
-if fecha_nac_rango and "FechaNac" in df_filtrado.columns:
-    if isinstance(fecha_nac_rango, tuple) and len(fecha_nac_rango) == 2:
-        desde, hasta = fecha_nac_rango
-        df_filtrado = df_filtrado[
-            (df_filtrado["FechaNac"] >= desde) & (df_filtrado["FechaNac"] <= hasta)
-        ]
+filtros = {"texto": texto_busqueda}
+if sexo != "Todos":
+    filtros["Sexo"] = sexo
+if estatus != "Todos":
+    filtros["Estatus"] = 1 if estatus == "Activo" else 0
+if red_seleccionada != "Todas":
+    filtros["CodRed"] = red_seleccionada.split(" - ", 1)[0]
+if estado_civil:
+    filtros["EstadoCivil"] = [ESTADO_CIVIL_CODIGOS[e] for e in estado_civil]
+if (
+    isinstance(fecha_nac_rango, tuple)
+    and len(fecha_nac_rango) == 2
+    and fecha_nac_rango != fecha_rango_default
+):
+    # Con el rango completo no se filtra, para no excluir fechas vacías
+    filtros["FechaNac"] = fecha_nac_rango
+
+p1, p2 = st.columns([0.8, 0.2])
+with p2:
+    tamano_pagina = st.selectbox(
+        "Filas por página", options=[50, 100, 250, 500], key="tamano_pagina"
+    )
 
-total = len(df)
-filtrados = len(df_filtrado)
-activos = (
-    int((df_filtrado["Estatus"].apply(estatus_a_num) == 1).sum())
-    if "Estatus" in df_filtrado.columns
-    else 0
+# Volver a la primera página cuando cambian los filtros
+if st.session_state.get("filtros_anteriores") != filtros:
+    st.session_state.filtros_anteriores = filtros
+    st.session_state.pagina_resultados = 1
+
+# Página de resultados por usuario; la versión del motor cambia con los datos
+resultado = st.session_state.cache_app.get_or_load(
+    user_scope(st.session_state.get("user")),
+    "consulta",
+    (
+        motor.version,
+        tuple(sorted((k, repr(v)) for k, v in filtros.items())),
+        st.session_state.pagina_resultados,
+        tamano_pagina,
+    ),
+    lambda: motor.search(
+        filtros,
+        page=st.session_state.pagina_resultados,
+        page_size=tamano_pagina,
+    ),
 )
+if st.session_state.pagina_resultados > resultado["pages"]:
+    st.session_state.pagina_resultados = resultado["pages"]
+    st.rerun()
+
+with p1:
+    st.number_input(
+        f"Página (de {resultado['pages']})",
+        min_value=1,
+        max_value=resultado["pages"],
+        step=1,
+        key="pagina_resultados",
+    )
+
+# Copia superficial: el frame cacheado es compartido entre reejecuciones
+df_filtrado = agregar_estado_civil_texto(resultado["frame"].copy(deep=False))
 
 m1, m2, m3 = st.columns(3)
 m1.metric("Total registros", total)
-m2.metric("Resultado filtrado", filtrados)
-m3.metric("Activos en resultado", activos)
+m2.metric("Resultado filtrado", resultado["total"])
+m3.metric("Activos en resultado", resultado["activos"])
 
 columnas_mostrar = [
     c
@@ -273,3 +312,36 @@ if not df_filtrado.empty:
     )
 else:
     st.info("No hay resultados con los filtros seleccionados.")
+
+with st.expander("⬇️ Exportar resultado filtrado"):
+    st.caption(
+        "Exporta todos los registros que cumplen los filtros actuales (no solo "
+        "la página visible)."
+    )
+    e1, e2 = st.columns([0.3, 0.7])
+    with e1:
+        formato = st.selectbox(
+            "Formato", options=list(EXPORT_FORMATS), key="formato_exportar"
+        )
+    with e2:
+        st.write("")
+        if st.button("Generar archivo", disabled=not resultado["total"]):
+            try:
+                exportar_resultado(motor, filtros, formato, resultado["total"])
+            except Exception as e:
+                st.error(f"No se pudo exportar: {e}")
+
+    archivo = st.session_state.get("archivo_exportado")
+    if archivo:
+        # El contenido se lee solo cuando se pide la descarga, no en cada
+        # reejecución de la página mientras el archivo espera en la sesión
+        if st.button(f"Preparar {archivo['nombre']} ({archivo['filas']} filas)"):
+            archivo["archivo"].seek(0)
+            # Tras la descarga el archivo se descarta; no queda en el servidor
+            st.download_button(
+                f"Descargar {archivo['nombre']}",
+                data=archivo["archivo"].read(),
+                file_name=archivo["nombre"],
+                mime=archivo["mime"],
+                on_click=descartar_exportacion,
+            )
@@ -0,0 +1,74 @@
+import streamlit as st
+
+from data.bulk_import import COLUMN_ALIASES, CreyentesImporter
+from helpers.navigation import make_sidebar
+
+st.set_page_config(page_title="Importar creyentes", layout="wide", page_icon="")
+
+make_sidebar()
+
+st.title("Importar creyentes")
+
+if "conexion" not in st.session_state or st.session_state.conexion is None:
+    st.error("No hay conexión a la base de datos. Vuelve a Inicio para inicializarla.")
+    st.stop()
+
+if not st.session_state.rol_user.has_permission("Creyentes", "create"):
+    st.error("No tienes permisos para registrar creyentes.")
+    st.stop()
+
+st.write(
+    "Sube un archivo CSV o XLSX con una fila por creyente. Se aplican las mismas "
+    "reglas del formulario de registro: Cédula, Nombre, Apellido, Teléfono y Red "
+    "son obligatorios; las cédulas ya registradas se rechazan."
+)
+with st.expander("Columnas reconocidas"):
+    st.write(", ".join(sorted(set(COLUMN_ALIASES.values()))))
+    st.caption(
+        "Los encabezados no distinguen mayúsculas, acentos ni espacios "
+        "(p. ej. «Fecha de nacimiento», «Teléfono», «Profesión»). Estado civil "
+        "acepta S, C, D, V, U o el texto; Red y Profesión aceptan el código o "
+        "el nombre. Fechas en DD/MM/AAAA o AAAA-MM-DD."
+    )
+
+archivo = st.file_uploader("Archivo", type=["csv", "xlsx"])
+
+if archivo is not None and st.button("Importar", type="primary"):
+    importador = CreyentesImporter(
+        st.session_state.creyentes_crud,
+        st.session_state.lookup_cache.get(),
+        user=st.session_state.get("user", 0),
+    )
+    barra = st.progress(0.0, text="Importando...")
+
+    def avance(filas, fraccion):
+        barra.progress(fraccion, text=f"{filas} filas procesadas")
+
+    try:
+        resultado = importador.run(archivo.getvalue(), archivo.name, progress=avance)
+    except Exception as e:
+        st.error(f"No se pudo leer el archivo: {e}")
+        st.stop()
+    barra.progress(1.0, text="Importación terminada")
+    st.session_state.resultado_importacion = resultado
+    # Los nuevos registros aparecen en las consultas y en el editor de hoy
+    st.session_state.snapshot_creyentes.refresh(force=True)
+
+resultado = st.session_state.get("resultado_importacion")
+if resultado is not None:
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Filas leídas", resultado.total)
+    col2.metric("Insertadas", resultado.inserted)
+    col3.metric("Rechazadas", resultado.rejected)
+    st.caption(f"Tiempo: {resultado.seconds:.1f} s")
+
+    if resultado.errors:
+        errores = resultado.errors_frame()
+        st.subheader("Errores por fila")
+        st.dataframe(errores, use_container_width=True, hide_index=True)
+        st.download_button(
+            "Descargar errores (CSV)",
+            data=errores.to_csv(index=False).encode("utf-8-sig"),
+            file_name="errores_importacion.csv",
+            mime="text/csv",
+        )
@@ -0,0 +1,103 @@
+import streamlit as st
+
+from helpers.navigation import esperar_datos, make_sidebar
+
+st.set_page_config(page_title="Estadísticas", layout="wide", page_icon="")
+
+make_sidebar()
+
+st.title("Estadísticas de creyentes")
+
+ESTADO_CIVIL_MAP = {
+    "S": "Soltero(a)",
+    "C": "Casado(a)",
+    "D": "Divorciado(a)",
+    "V": "Viudo(a)",
+    "U": "Unión de hecho",
+}
+ESTATUS_MAP = {1: "Activo", 0: "Inactivo"}
+SIN_DATO = "Sin dato"
+
+if "conexion" not in st.session_state or st.session_state.conexion is None:
+    st.error("No hay conexión a la base de datos. Vuelve a Inicio para inicializarla.")
+    st.stop()
+
+if not st.session_state.rol_user.has_permission("Creyentes", "read"):
+    st.error("No tienes permisos para consultar creyentes.")
+    st.stop()
+
+esperar_datos("resumen", "lookups")
+
+
+def tabla(resumen, dimension, etiquetas=None, columna="Valor"):
+    # Solo se leen los agregados ya calculados, nunca las filas
+    from pandas import DataFrame
+
+    etiquetas = etiquetas or {}
+    filas = [
+        (SIN_DATO if valor is None else etiquetas.get(valor, valor), total)
+        for valor, total in resumen.counts.get(dimension, ())
+    ]
+    return DataFrame(filas, columns=[columna, "Creyentes"]).set_index(columna)
+
+
+resumen = st.session_state.resumen_creyentes.get()
+redes_map = st.session_state.lookup_cache.get().redes_map
+estatus = dict(resumen.counts.get("Estatus", ()))
+
+m1, m2, m3 = st.columns(3)
+m1.metric("Total creyentes", resumen.total)
+m2.metric("Activos", estatus.get(1, 0))
+m3.metric("Inactivos", estatus.get(0, 0))
+
+c1, c2 = st.columns(2)
+with c1:
+    st.subheader("Por red")
+    st.bar_chart(
+        tabla(
+            resumen,
+            "CodRed",
+            {cod.upper(): f"{cod} - {nombre}" for cod, nombre in redes_map.items()},
+            "Red",
+        )
+    )
+with c2:
+    st.subheader("Por estado civil")
+    st.bar_chart(tabla(resumen, "EstadoCivil", ESTADO_CIVIL_MAP, "Estado civil"))
+
+c3, c4 = st.columns(2)
+with c3:
+    st.subheader("Por sexo")
+    st.dataframe(tabla(resumen, "Sexo", columna="Sexo"), use_container_width=True)
+with c4:
+    st.subheader("Por estatus")
+    st.dataframe(
+        tabla(resumen, "Estatus", ESTATUS_MAP, "Estatus"), use_container_width=True
+    )
+
+st.subheader("Ingresos por mes")
+t1, t2 = st.tabs(["Fecha de ingreso", "Fecha de registro"])
+with t1:
+    meses = tabla(resumen, "MesIngreso", columna="Mes")
+    st.line_chart(meses.drop(SIN_DATO, errors="ignore"))
+with t2:
+    meses = tabla(resumen, "MesRegistro", columna="Mes")
+    st.line_chart(meses.drop(SIN_DATO, errors="ignore"))
+
+c5, c6 = st.columns(2)
+with c5:
+    st.subheader("Por estado")
+    st.dataframe(
+        tabla(resumen, "Estado", columna="Estado").sort_values(
+            "Creyentes", ascending=False
+        ),
+        use_container_width=True,
+    )
+with c6:
+    st.subheader("Por ciudad")
+    st.dataframe(
+        tabla(resumen, "Ciudad", columna="Ciudad").sort_values(
+            "Creyentes", ascending=False
+        ),
+        use_container_width=True,
+    )